@@ -4,28 +4,420 @@ from django.db.models.fields import NOT_PROVIDED
 
 from django.db.models.fields.related import *
 from django.contrib.contenttypes.generic import GenericRelation
+from django.db import DatabaseError, router
+from django.db.models import Model
 
+from . import profiling
+from .bulk import PK_TYPECODE, bulk_link, compact_pks, persist, pipelined, \
+    raw_insert, save_atomically
 from .utils import *
 from .constants import *
 
 import datetime
-from random import random
+from array import array
+from itertools import izip, repeat
+from multiprocessing import Pool
+from random import Random
+from sys import getsizeof
 
 
 if not hasattr(__builtins__, 'long'):
     long = int  # python < 3.0
 
+NOT_BLANK = object()  # marks fields which are never left blank
+
+plans = {}  # (mommy class, model, fill_null) -> GenerationPlan
+
+
+class GenerationPlan(object):
+    """
+    Everything mommy needs to know about a model to generate its values,
+    worked out once instead of once per instance.
+
+    Each step is a tuple
+    (name, field, generator, null_chance, blank_value, batch_generator):
+    generator -- function called as generator(mommy, field); None if the
+    field is only filled when its value is provided
+    null_chance -- should the field be left null by chance?
+    blank_value -- value used when the field is left blank by chance, or
+    NOT_BLANK if it is never left blank
+    batch_generator -- function called as batch_generator(mommy, field, n)
+    returning a list with n values
+
+    """
+    def __init__(self, mommy):
+        mommy_cls = mommy.__class__
+        fill_null = mommy.fill_null
+        own = mommy.own_generators()
+
+        self.fields = []
+        self.flat_fields = []
+        self.m2m_steps = []
+        self.stale = False  # set once the plan's generators changed
+
+        for field in mommy.get_fields():
+            is_related = isinstance(field, RelatedField)
+            generator = self.resolve(mommy, field, own)
+            null_chance = False
+            blank_value = NOT_BLANK
+
+            if is_related and field.null:
+                generator = None  # ignore nullable related fields
+
+            elif type(field) in (AutoField, GenericRelation):
+                generator = None
+
+            elif field.null and (fill_null is False):
+                generator = None
+
+            else:
+                null_chance = field.null and (fill_null is None)
+
+                if field.blank:
+                    if field.default == NOT_PROVIDED:
+                        blank_value = ''
+                    else:
+                        blank_value = field.default
+
+            batch_generator = None
+            if generator is not None:
+                batch_generator = self.resolve_batch(mommy_cls, field, generator)
+
+            step = (field.name, field, generator, null_chance, blank_value,
+                    batch_generator)
+            self.fields.append(step)
+
+            # non-provided related fields are ignored by flat plans
+            if is_related:
+                step = (field.name, field, None, False, NOT_BLANK, None)
+            self.flat_fields.append(step)
+
+        for field in mommy.get_m2m_fields():
+            self.m2m_steps.append(
+                (field.name, field, self.resolve(mommy, field, own)))
+
+    def steps(self, flat):
+        return self.flat_fields if flat else self.fields
+
+    @staticmethod
+    def resolve(mommy, field, own=None):
+        """
+        Decides which function should create the value for field.
+
+        Evaluation order:
+            choices -> value_for_<fieldname>field -> value_for_<fieldtype>,
+            where fieldtype is the field's class or its closest base class
+            with a generator. Generators in `own`, set on the mommy itself,
+            come before those of its class.
+
+        """
+        if field.choices:  # get from avaiable choices
+            weights = mommy.choice_weights.get(mommy.model, {})
+            return ChoiceSampler(field, weights.get(field.name))
+
+        mommy_cls = mommy.__class__
+        own = own or {}
+        generator = own.get(field.name + 'field')
+
+        if generator is None:
+            generator = mommy_cls.generators.get(field.name + 'field')
+
+        if generator is None:
+            generator = mommy_cls.generator_for(field.__class__, own)
+
+        if generator is None:  # unsupported field type
+            field_cls_name = field.__class__.__name__.lower()
+
+            def unsupported(mommy, field):
+                raise TypeError('%s is not supported by mommy.' % field_cls_name)
+            return unsupported
+
+        return generator
+
+    @staticmethod
+    def resolve_batch(mommy_cls, field, generator):
+        """
+        Returns the function creating a whole column of values for field.
+
+        A values_for_<name> method is used if value_for_<name> is the field's
+        generator and it is not overridden by a subclass more specific than
+        the one defining values_for_<name>. Otherwise, generator is called
+        once per value, so subclasses overriding value_for_<name> still work.
+
+        """
+        if isinstance(generator, ChoiceSampler):
+            return generator.many
+
+        name = getattr(generator, '__name__', '')
+        mro = mommy_cls.__mro__
+
+        if name.startswith('value_for_'):
+            batch_name = 'values_for_' + name[len('value_for_'):]
+
+            owner = [cls for cls in mro if name in cls.__dict__]
+            batch_owner = [cls for cls in mro if batch_name in cls.__dict__]
+
+            if batch_owner and mro.index(batch_owner[0]) <= mro.index(owner[0]):
+                return getattr(mommy_cls, batch_name)
+
+        return lambda mommy, field, n: [generator(mommy, field) for i in xrange(n)]
+
+
+class ChoiceSampler(object):
+    """
+    Generator for fields with choices. The choice values, grouped ones
+    included, and their weights are worked out once per field.
+
+    Keyword arguments:
+    field -- field with choices
+    weights -- optional dict mapping choice values to their weight.
+    Values not in it weigh 1.
+
+    """
+    def __init__(self, field, weights=None):
+        self.values = flatten_choices(field.choices)
+        self.cum_weights = None
+
+        if weights:
+            self.cum_weights = cumulative_weights(self.values, weights)
+
+    def __call__(self, mommy, field):
+        return self.many(mommy, field, 1)[0]
+
+    def many(self, mommy, field, n):
+        return raw_choices(self.values, n, self.cum_weights, mommy.rng)
+
+
+class ParentPool(object):
+    """
+    Parents shared by the instances of a foreign key, so many children
+    get the same parent instead of one brand new parent each.
+
+    A pool given to mommy is only a configuration: every Mommy fills an
+    empty copy of it, so parents are never carried over to later calls.
+
+    Keyword arguments:
+    size -- max number of parents. Once the pool is full, children get
+    parents by round robin or random choice (see strategy).
+    fan_out -- number of children per parent. A new parent is created
+    every fan_out children; the pool is not bounded.
+    strategy -- 'round_robin' or 'random'
+
+    """
+    def __init__(self, size=None, fan_out=None, strategy='round_robin'):
+        assert bool(size) != bool(fan_out), \
+            'either size or fan_out must be provided, not both'
+        assert strategy in ('round_robin', 'random'), 'unknown strategy'
+
+        self.size = size
+        self.fan_out = fan_out
+        self.strategy = strategy
+        self.parents = []
+        self.uses = 0
+
+    def get(self, make_parent, rng=None):
+        """
+        Returns a parent from the pool. make_parent is called, without
+        arguments, when a new parent is needed. rng is the random.Random
+        used by the 'random' strategy.
+
+        """
+        if self.fan_out:
+            if self.uses % self.fan_out == 0:
+                self.parents.append(make_parent())
+            parent = self.parents[-1]
+
+        elif len(self.parents) < self.size:
+            parent = make_parent()
+            self.parents.append(parent)
+
+        elif self.strategy == 'random':
+            parent = (rng or default_rng).choice(self.parents)
+
+        else:
+            parent = self.parents[self.uses % self.size]
+
+        self.uses += 1
+        return parent
+
+    def copy(self):
+        """
+        Returns an empty pool with the same settings.
+
+        """
+        return self.__class__(size=self.size, fan_out=self.fan_out,
+                              strategy=self.strategy)
+
+
+def prepare_chunk(task):
+    """
+    Prepares a chunk of instances in a worker process.
+    See Mommy.make_many.
+
+    """
+    mommy_cls, model, fill_null, fk_pool, seed, overrides, size, attrs = task
+
+    mommy = mommy_cls(model, fill_null=fill_null, fk_pool=fk_pool, seed=seed)
+    for name, value in overrides.items():
+        setattr(mommy, name, value)
+    return mommy.build_many(size, **attrs)
+
+
+def changes_plans(name):
+    """
+    Tells whether setting attribute `name` of a mommy, or of its class,
+    changes how values are generated.
+
+    """
+    return name.startswith(('value_for_', 'values_for_')) or \
+        name == 'choice_weights'
+
+
+class MommyType(type):
+    """
+    Collects the value_for_<suffix> generators of a Mommy class, its own and
+    inherited ones, when the class is created, and again whenever one is
+    set on, or deleted from, the class or its bases later on.
+
+    """
+    def __init__(cls, name, bases, attrs):
+        super(MommyType, cls).__init__(name, bases, attrs)
+        cls.collect_generators()
+
+    def __setattr__(cls, name, value):
+        super(MommyType, cls).__setattr__(name, value)
+
+        if changes_plans(name):
+            cls.forget_plans()
+
+    def __delattr__(cls, name):
+        super(MommyType, cls).__delattr__(name)
+
+        if changes_plans(name):
+            cls.forget_plans()
+
+    def collect_generators(cls):
+        cls.generators = {}  # suffix -> generator
+        cls.field_class_generators = {}  # field class -> generator or None
+
+        for klass in reversed(cls.__mro__):
+            for attr in vars(klass):
+                if attr.startswith('value_for_'):
+                    cls.generators[attr[len('value_for_'):]] = getattr(cls, attr)
+
+    def forget_plans(cls):
+        """
+        Collects the generators of cls and its subclasses again, and drops
+        their compiled plans.
+
+        """
+        classes = [cls]
+
+        while classes:
+            klass = classes.pop()
+            klass.collect_generators()
+            classes.extend(klass.__subclasses__())
+
+            for key in [key for key in plans if key[0] is klass]:
+                plans.pop(key).stale = True
+
+    def generator_for(cls, field_cls, own=None):
+        """
+        Returns the generator for the first class in field_cls's MRO having
+        one, so subclasses of supported fields are supported too. Returns
+        None if there is no such class. Generators in `own`, set on a mommy
+        itself, come before those of cls.
+
+        """
+        if not own:
+            try:
+                return cls.field_class_generators[field_cls]
+            except KeyError:
+                pass
+
+        generator = None
+        for klass in field_cls.__mro__:
+            name = klass.__name__.lower()
+            generator = (own or {}).get(name) or cls.generators.get(name)
+
+            if generator is not None:
+                break
+
+        if not own:
+            cls.field_class_generators[field_cls] = generator
+        return generator
+
 
 class Mommy(object):
-    def __init__(self, model, fill_null=None):
+    __metaclass__ = MommyType
+
+    # model -> {field name -> {choice value: weight}}, for fields with choices
+    choice_weights = {}
+
+    _plan = None
+
+    def __init__(self, model, fill_null=None, fk_pool=None, seed=None,
+                 signals=True, on_batch=None):
         """
         Keyword arguments:
         model -- base model instance
         fill_null -- force null or non null value for nullable fields. If None, leave up to chance.
+        fk_pool -- reuse parents for foreign keys. Either a pool size or a
+        ParentPool for all foreign keys, or a dict mapping field names or
+        parent models to a pool size or ParentPool. Field names only match
+        the fields of `model`, the rest also applies to the parents' own
+        foreign keys.
+        seed -- seed for this mommy's own random.Random, used for every
+        generated value (parents included). If None, the global random
+        module is used.
+        signals -- if False, instances, their parents and m2m links are
+        inserted with bulk statements, so no model signal (pre/post save,
+        m2m_changed) is sent.
+        on_batch -- function called as on_batch(model, instances) once for
+        every list of instances of the same model committed together.
+        Meant to replace per instance signal receivers when signals is False.
 
         """
         self.model = model
         self.fill_null = fill_null
+        self.fk_pool = fk_pool
+        self.seed = seed
+        self.signals = signals
+        self.on_batch = on_batch
+        self.rng = default_rng if seed is None else Random(seed)
+        self.pools = {}
+
+    def substream(self, index):
+        """
+        Returns a copy of this mommy with an independent random stream,
+        derived from its seed and index. Meant for splitting the generation
+        of data between workers in a reproducible way.
+
+        """
+        assert self.seed is not None, 'substreams need a seeded mommy'
+
+        return self.__class__(self.model, fill_null=self.fill_null,
+                              fk_pool=self.fk_pool,
+                              seed=derive_seed(self.seed, index),
+                              signals=self.signals, on_batch=self.on_batch)
+
+    def mommy_for(self, model):
+        """
+        Returns the mommy used to create related instances of `model`.
+        It shares this mommy's random stream and parent pools. Pools keyed
+        by field name only apply to this mommy's own model.
+
+        """
+        fk_pool = self.fk_pool
+
+        if isinstance(fk_pool, dict):
+            fk_pool = dict((key, config) for key, config in fk_pool.items()
+                           if not isinstance(key, basestring))
+
+        mommy = self.__class__(model, fk_pool=fk_pool)
+        mommy.rng = self.rng
+        mommy.pools = self.pools
+        return mommy
 
     def make(self, **attrs):
         """
@@ -49,7 +441,38 @@ class Mommy(object):
         flat -- should related fields be ignored?
 
         """
-        return self.__attrs(False, flat, self.get_fields(), **attrs)
+        return self.__attrs(flat, **attrs)
+
+    def attrs_many(self, qty, flat, layout='rows', **attrs):
+        """
+        Returns the attributes of `qty` instances, generated in one pass.
+
+        Arguments:
+        flat -- should related fields be ignored?
+        layout -- 'rows' for a list with a dict per instance, 'columns' for a
+        dict mapping each field name to the list of its values (None where
+        the field was left null).
+
+        """
+        assert layout in ('rows', 'columns'), 'unknown layout'
+
+        if layout == 'rows':
+            return self.__attrs_many(qty, flat, **attrs)
+
+        columns = {}
+        for name, targets, values in self.__columns(qty, flat, **attrs):
+            column = columns.get(name)
+
+            if column is None and len(targets) == qty:
+                columns[name] = list(values)
+                continue
+            elif column is None:
+                column = columns[name] = [None] * qty
+
+            for index, value in izip(targets, values):
+                column[index] = value
+
+        return columns
 
     def get_fields(self):
         """
@@ -72,119 +495,471 @@ class Mommy(object):
         """
         return self.get_fields() + self.get_m2m_fields()
 
-    def __attrs(self, commit, flat, fields, **attrs):
+    def __setattr__(self, name, value):
+        super(Mommy, self).__setattr__(name, value)
+
+        if changes_plans(name):
+            self._plan = None
+
+    def own_generators(self):
+        """
+        Returns the value_for_<suffix> functions set on this mommy itself,
+        rather than on its class, as generators. They are called with the
+        field only.
+
+        """
+        return dict(
+            (name[len('value_for_'):], lambda mommy, field, func=func: func(field))
+            for name, func in vars(self).items()
+            if name.startswith('value_for_'))
+
+    def get_plan(self):
+        """
+        Returns the generation plan for this mommy's class, model and
+        fill_null setting. Plans are compiled once and shared by all
+        instances through the `plans` registry, unless generators or
+        choice weights were set on the mommy itself.
+
+        """
+        if self._plan is not None and self._plan.stale:
+            self._plan = None
+
+        if self._plan is None and \
+           [name for name in vars(self) if changes_plans(name)]:
+            self._plan = GenerationPlan(self)
+
+        if self._plan is None:
+            key = (self.__class__, self.model, self.fill_null)
+            plan = plans.get(key)
+
+            if plan is None:
+                plan = plans[key] = GenerationPlan(self)
+            self._plan = plan
+        return self._plan
+
+    def __attrs(self, flat, **attrs):
         """
         Returns all fields, but m2m fields, used to populate a model. You can
         use this method directly to create fake form data.
 
         Arguments:
-        commit -- should related fields be commited?
         flat -- should related fields be ignored?
-        fields -- which fields should be created?
         **attrs -- optional defined values for fields
 
         """
         rt = {}  # return value / values for fields
+        plan = self.get_plan()
+        stats = profiling.active
 
-        for field in fields:
+        for name, field, generator, null_chance, blank_value, batch in plan.steps(flat):
             # field value was provided. Ignoring...
-            if field.name in attrs:
-                rt[field.name] = attrs[field.name]
-
-            elif isinstance(field, RelatedField) and flat:
-                continue  # ignore non-provided related fields
+            if name in attrs:
+                rt[name] = attrs[name]
 
-            elif isinstance(field, RelatedField) and field.null:
-                continue  # ignore nullable related fields
-
-            elif type(field) in (AutoField, GenericRelation):
+            elif generator is None:
                 continue
 
-            elif field.null and (self.fill_null is False):
+            elif null_chance and self.rng.choice(LEAVE_TO_CHANCE):
                 continue
 
-            elif field.null and (self.fill_null is None) and choice(LEAVE_TO_CHANCE):
-                continue
+            elif blank_value is not NOT_BLANK and self.rng.choice(LEAVE_TO_CHANCE):
+                rt[name] = blank_value
 
-            elif field.blank and choice(LEAVE_TO_CHANCE):
-                if field.default == NOT_PROVIDED:
-                    rt[field.name] = ''
-                else:
-                    rt[field.name] = field.default
+            elif stats is None:
+                rt[name] = generator(self, field)
 
             else:
-                rt[field.name] = self.__get_value_for_field(field)
+                start = profiling.timer()
+                rt[name] = generator(self, field)
+                stats.add_field(self.model, name, profiling.timer() - start)
 
-                if hasattr(rt[field.name], 'save') and commit:
-                    rt[field.name].save()
+                if stats.memory:
+                    stats.add_field_bytes(self.model, name, generator,
+                                          getsizeof(rt[name]))
 
         return rt
 
-    def __m2m_attrs(self, fields, **attrs):
+    def __attrs_many(self, qty, flat, **attrs):
+        """
+        Same as __attrs, but returns the values for `qty` instances.
+        Values are generated a whole field (column) at a time.
+
+        """
+        rows = [{} for i in xrange(qty)]
+
+        for name, targets, values in self.__columns(qty, flat, **attrs):
+            for index, value in izip(targets, values):
+                rows[index][name] = value
+
+        return rows
+
+    def __columns(self, qty, flat, **attrs):
+        """
+        Yields (name, indexes, values) for every field to populate in `qty`
+        instances: a field's values for the instances of the given indexes.
+        Instances left out, when a field is left null, don't get a value.
+
+        """
+        plan = self.get_plan()
+        choice = self.rng.choice
+        everyone = xrange(qty)
+        stats = profiling.active
+
+        for name, field, generator, null_chance, blank_value, batch in plan.steps(flat):
+            if name in attrs:
+                yield name, everyone, repeat(attrs[name], qty)
+                continue
+
+            elif generator is None:
+                continue
+
+            targets = everyone
+            if null_chance:
+                targets = [i for i in targets if not choice(LEAVE_TO_CHANCE)]
+
+            if blank_value is not NOT_BLANK:
+                blanks, filled = [], []
+
+                for index in targets:
+                    if choice(LEAVE_TO_CHANCE):
+                        blanks.append(index)
+                    else:
+                        filled.append(index)
+
+                yield name, blanks, repeat(blank_value, len(blanks))
+                targets = filled
+
+            if stats is None:
+                yield name, targets, batch(self, field, len(targets))
+                continue
+
+            start = profiling.timer()
+            values = batch(self, field, len(targets))
+            stats.add_field(self.model, name, profiling.timer() - start,
+                            len(targets))
+
+            if stats.memory:
+                values = list(values)
+                stats.add_field_bytes(self.model, name, generator,
+                                      sum(getsizeof(value) for value in values))
+            yield name, targets, values
+
+    def __m2m_attrs(self, **attrs):
         rt = {}
 
-        for field in fields:
+        for name, field, generator in self.get_plan().m2m_steps:
             # field value was provided. Ignoring...
-            if field.name in attrs:
-                rt[field.name] = attrs[field.name]
+            if name in attrs:
+                rt[name] = attrs[name]
             else:
-                rt[field.name] = self.__get_value_for_field(field)
+                rt[name] = generator(self, field)
         return rt
 
-    def __make(self, commit, **attrs):
+    def make_many(self, qty=5, bulk=False, batch_size=None, workers=None,
+                  pipeline=False, queue_depth=2, atomic=False,
+                  savepoint_every=None, returning='instances', **attrs):
         """
-        If attribute value is provided in attrs, it is not overwritten.
-        AutoField and GenericRelation fields are ignored.
-        Nullable OneToOne, ForeignKey and ManyToMany fields are ignored.
+        Makes `qty` instances of the registered model. (commits instances)
 
         Keyword arguments:
-        commit (bool) -- Should instance be commited?
-        attrs (dict) -- pre-defined instance values
+        bulk -- insert instances with bulk_create instead of one save per
+        instance. save() is not called for the bulk inserted instances.
+        batch_size -- max number of instances per bulk insert
+        workers -- number of processes preparing instances. Prepared chunks
+        are sent back and bulk inserted by this process only.
+        pipeline -- prepare instances in another thread, a chunk at a time,
+        while the previous chunks are bulk inserted. Generators run in that
+        thread, so they shouldn't use the database.
+        queue_depth -- max number of prepared chunks waiting to be inserted,
+        at least 1
+        atomic -- save everything in a single transaction.
+        savepoint_every -- save instances under a savepoint every this many
+        instances (implies atomic). On errors, only instances after the
+        last savepoint are rolled back; the error is raised afterwards.
+        See bulk.save_atomically for databases without savepoints.
+        returning -- 'instances' returns the list of instances. 'pk' returns
+        their primary keys only: an xrange if contiguous, else an array of
+        integers for auto fields or a list. None returns the number of
+        instances. Unless instances are returned, they are made a chunk at
+        a time.
+
+        """
+        assert returning in ('instances', 'pk', None), 'unknown returning mode'
+
+        if workers:
+            chunks = self.__build_parallel(qty, workers, **attrs)
+        elif pipeline:
+            chunks = pipelined(
+                (self.build_many(size, **attrs)
+                 for size in self.__chunk_sizes(qty, CHUNK_SIZE)),
+                queue_depth)
+        elif returning != 'instances':
+            chunks = (self.build_many(size, **attrs)
+                      for size in self.__chunk_sizes(qty, CHUNK_SIZE))
+        else:
+            chunks = [self.build_many(qty, **attrs)]
+
+        bulk = bulk or workers or pipeline
+        instances = []
+        pks = []
+        if isinstance(self.model._meta.pk, AutoField):
+            pks = array(PK_TYPECODE)  # 8 bytes per key
+        count = [0]
+
+        def save(built):
+            self.__save_many(built, bulk, batch_size)
+            count[0] += len(built)
+
+            if returning == 'instances':
+                instances.extend(instance for instance, m2m_attrs in built)
+            elif returning == 'pk':
+                saved = [instance.pk for instance, m2m_attrs in built]
+                if None in saved:
+                    raise DatabaseError('The primary keys of saved %s '
+                                        'instances are unknown.'
+                                        % self.model.__name__)
+                pks.extend(saved)
+
+        if atomic or savepoint_every:
+            using = router.db_for_write(self.model)
+            save_atomically(chunks, save, using, savepoint_every)
+        else:
+            for built in chunks:
+                save(built)
+
+        if returning == 'pk':
+            return compact_pks(pks)
+        elif returning is None:
+            return count[0]
+        return instances
+
+    def load_many(self, qty=5, batch_size=None, **attrs):
+        """
+        Inserts `qty` rows of the registered model straight from generated
+        values, with executemany, without creating instances of the model.
+        Returns the primary keys of each batch (see bulk.raw_insert).
+
+        Generated parents are bulk inserted first, as instances. m2m fields
+        are ignored.
+
+        Keyword arguments:
+        batch_size -- max number of rows per executemany call
 
         """
+        rows = self.__attrs_many(qty, False, **attrs)
+        parents = [value for row in rows for value in row.values()
+                   if isinstance(value, Model) and value._state.adding]
 
-        m2m_attrs = self.__m2m_attrs(self.get_m2m_fields(), **attrs)
-        attrs = self.__attrs(commit, False, self.get_fields(), **attrs)
+        if parents:
+            persist(parents, bulk=True, batch_size=batch_size,
+                    on_batch=self.on_batch)
 
-        instance = self.model(**attrs)
+        stats = profiling.active
+        start = stats and profiling.timer()
+        pks = raw_insert(self.model, rows, batch_size)
 
-        if commit:
-            instance.save()
+        if stats is not None:
+            stats.add_phase(self.model, 'save', profiling.timer() - start, qty)
+        return pks
 
-            # m2m instance are only persisted if commit is True
-            for key, m2m_values in m2m_attrs.items():
-                m2m_relation = getattr(instance, key)
+    def prepare_many(self, qty=5, **attrs):
+        """
+        Prepares `qty` instances of the registered model. (does not commit
+        instances)
 
-                for value in m2m_values:
-                    m2m_relation.add(value)
+        """
+        return [instance for instance, m2m_attrs in self.build_many(qty, **attrs)]
 
-        return instance
+    def iter_make(self, qty=5, chunk_size=CHUNK_SIZE, batch_size=None, **attrs):
+        """
+        Makes `qty` instances of the registered model, yielding them as they
+        are committed. Instances are generated and bulk inserted `chunk_size`
+        at a time, so only one chunk is kept in memory. Rows are inserted with
+        bulk_create (inherited models one table at a time), so the model's
+        save() method is never called.
+
+        Keyword arguments:
+        chunk_size -- number of instances generated and inserted together
+        batch_size -- max number of instances per bulk insert
 
-    def __get_value_for_field(self, field):
         """
-        Decides which method should create the value for field.
+        for size in self.__chunk_sizes(qty, chunk_size):
+            built = self.build_many(size, **attrs)
+            self.__save_many(built, True, batch_size)
 
-        Evaluation order:
-            choices -> value_for_<fieldname>field -> value_for_<fieldtype>
+            for instance, m2m_attrs in built:
+                yield instance
 
+    def iter_prepare(self, qty=5, chunk_size=CHUNK_SIZE, **attrs):
         """
-        field_cls = field.__class__
-        field_cls_name = field_cls.__name__.lower()
+        Prepares `qty` instances of the registered model, yielding them
+        as they are generated, `chunk_size` at a time.
 
-        field_name_method = 'value_for_' + field.name + "field"
-        field_type_method = 'value_for_' + field_cls_name
+        """
+        for size in self.__chunk_sizes(qty, chunk_size):
+            for instance, m2m_attrs in self.build_many(size, **attrs):
+                yield instance
 
-        if field.choices:  # get from avaiable choices
-            return choice(map(lambda c: c[0], field.choices))
+    def __build_parallel(self, qty, workers, **attrs):
+        """
+        Yields lists of (instance, m2m values) pairs prepared by a pool of
+        `workers` processes, in order. Each chunk of WORKER_CHUNK_SIZE
+        instances gets its own random stream, derived from this mommy's
+        seed if it has one, so a seed gives the same instances whatever
+        the number of workers.
+
+        The mommy class must be importable by the workers, so it can't be
+        declared inside a function. Choice weights set on the mommy itself
+        are sent along, generators set on it can't be. Parent pools are not
+        shared between chunks. Unsaved instances given in attrs are bulk
+        inserted first, so that every chunk refers to the same rows.
+
+        """
+        overrides = dict((name, value) for name, value in vars(self).items()
+                         if changes_plans(name))
+        generators = [name for name in overrides if name != 'choice_weights']
+        assert not generators, 'generators set on a mommy instance can\'t ' \
+            'be sent to worker processes, set them on its class: %s' % \
+            ', '.join(sorted(generators))
+
+        parents = [value for value in attrs.values()
+                   if isinstance(value, Model) and value._state.adding]
+        if parents:
+            persist(parents, bulk=True, on_batch=self.on_batch)
+
+        tasks = []
+
+        for i, size in enumerate(self.__chunk_sizes(qty, WORKER_CHUNK_SIZE)):
+            if self.seed is None:
+                seed = self.rng.getrandbits(64)
+            else:
+                seed = derive_seed(self.seed, i)
+
+            tasks.append((self.__class__, self.model, self.fill_null,
+                          self.fk_pool, seed, overrides, size, attrs))
+
+        pool = Pool(workers)
+        try:
+            for built in pool.imap(prepare_chunk, tasks):
+                yield built
+        finally:
+            pool.terminate()
+
+    def __chunk_sizes(self, qty, chunk_size):
+        assert chunk_size > 0, 'chunk_size must be positive'
 
-        elif hasattr(self, field_name_method):
-            return getattr(self, field_name_method)(field)
+        for start in xrange(0, qty, chunk_size):
+            yield min(chunk_size, qty - start)
 
-        elif hasattr(self, field_type_method):
-            return getattr(self, field_type_method)(field)
+    def __save_many(self, built, bulk, batch_size):
+        """
+        Commits (instance, m2m values) pairs, parents first.
+        Bulk statements are always used if signals are disabled.
+
+        """
+        stats = profiling.active
+
+        if self.signals and not bulk:
+            for instance, m2m_attrs in built:
+                persist([instance], on_batch=self.on_batch)
+
+                start = stats and profiling.timer()
+                self.__save_m2m(instance, m2m_attrs)
+
+                if stats is not None:
+                    stats.add_phase(self.model, 'm2m', profiling.timer() - start)
+            return
+
+        persist([instance for instance, m2m_attrs in built], bulk=True,
+                batch_size=batch_size, on_batch=self.on_batch)
+        start = stats and profiling.timer()
+
+        # all links of a m2m field go in with a single bulk insert
+        for name, field, generator in self.get_plan().m2m_steps:
+            links = [(instance, m2m_attrs[name]) for instance, m2m_attrs in built
+                     if m2m_attrs[name]]
+
+            if links and not bulk_link(field, links, batch_size):
+                for instance, values in links:
+                    self.__save_m2m(instance, {name: values})
+
+        if stats is not None:
+            stats.add_phase(self.model, 'm2m', profiling.timer() - start,
+                            len(built))
+
+    def __build(self, **attrs):
+        """
+        Returns a new, unsaved, instance and the values for its m2m fields.
+        Generated related instances are not saved either.
+
+        Keyword arguments:
+        attrs (dict) -- pre-defined instance values
+
+        """
+        stats = profiling.active
+        start = stats and profiling.timer()
 
-        else:  # unsupported field type
-            raise TypeError('%s is not supported by mommy.' % field_cls_name)
+        m2m_attrs = self.__m2m_attrs(**attrs)
+        attrs = self.__attrs(False, **attrs)
+
+        if stats is None:
+            return self.model(**attrs), m2m_attrs
+
+        generated = profiling.timer()
+        instance = self.model(**attrs)
+
+        stats.add_phase(self.model, 'generate', generated - start)
+        stats.add_phase(self.model, 'construct', profiling.timer() - generated)
+        return instance, m2m_attrs
+
+    def build_many(self, qty, **attrs):
+        """
+        Returns `qty` (instance, m2m values) pairs. Neither instances nor
+        their generated parents are saved.
+
+        """
+        stats = profiling.active
+        start = stats and profiling.timer()
+
+        rows = self.__attrs_many(qty, False, **attrs)
+        m2m_rows = [self.__m2m_attrs(**attrs) for row in rows]
+
+        if stats is None:
+            return [(self.model(**row), m2m_attrs)
+                    for row, m2m_attrs in izip(rows, m2m_rows)]
+
+        generated = profiling.timer()
+        built = [(self.model(**row), m2m_attrs)
+                 for row, m2m_attrs in izip(rows, m2m_rows)]
+
+        stats.add_phase(self.model, 'generate', generated - start, qty)
+        stats.add_phase(self.model, 'construct', profiling.timer() - generated, qty)
+        return built
+
+    def __save_m2m(self, instance, m2m_attrs):
+        for key, m2m_values in m2m_attrs.items():
+            if m2m_values:
+                getattr(instance, key).add(*m2m_values)
+
+    def __make(self, commit, **attrs):
+        """
+        If attribute value is provided in attrs, it is not overwritten.
+        AutoField and GenericRelation fields are ignored.
+        Nullable OneToOne, ForeignKey and ManyToMany fields are ignored.
+
+        Keyword arguments:
+        commit (bool) -- Should instance be commited?
+        attrs (dict) -- pre-defined instance values
+
+        """
+        instance, m2m_attrs = self.__build(**attrs)
+
+        if commit:
+            # saves unsaved parents, and their parents, before instance.
+            # m2m instance are only persisted if commit is True
+            self.__save_many([(instance, m2m_attrs)], False, None)
+
+        return instance
 
     def value_for_booleanfield(self, field):
         """
@@ -196,7 +971,7 @@ class Mommy(object):
         >>> assert value in (True, False), 'returned value is invalid'
 
         """
-        return choice((False, True))
+        return self.rng.choice((False, True))
 
     def value_for_nullbooleanfield(self, field):
         """
@@ -208,7 +983,7 @@ class Mommy(object):
         >>> assert value in (None, True, False), 'returned value is invalid'
 
         """
-        return choice((False, True))  # nullbooleanfield ahs null=True by default
+        return self.rng.choice((False, True))  # nullbooleanfield ahs null=True by default
 
     def value_for_smallintegerfield(self, field):
         """
@@ -220,42 +995,42 @@ class Mommy(object):
         >>> assert isinstance(value, int), 'value is not integer'
 
         """
-        return randint(MIN_SMALL_INT, MAX_SMALL_INT)
+        return self.rng.randint(MIN_SMALL_INT, MAX_SMALL_INT)
 
     def value_for_positivesmallintegerfield(self, field):
         """
         Returns a positive 16bits integer.
 
         """
-        return randint(0, MAX_SMALL_INT)
+        return self.rng.randint(0, MAX_SMALL_INT)
 
     def value_for_integerfield(self, field):
         """
         Returns a 32bits integer.
 
         """
-        return randint(MIN_INT, MAX_INT)
+        return self.rng.randint(MIN_INT, MAX_INT)
 
     def value_for_positiveintegerfield(self, field):
         """
         Returns a positive 32bits integer.
 
         """
-        return randint(0, MAX_INT)
+        return self.rng.randint(0, MAX_INT)
 
     def value_for_bigintegerfield(self, field):
         """
         Returns a 64bits integer.
 
         """
-        return randint(MIN_BIG_INT, MAX_BIG_INT)
+        return self.rng.randint(MIN_BIG_INT, MAX_BIG_INT)
 
     def value_for_floatfield(self, field):
         """
         Returns a random float value
 
         """
-        return random() * randint(MIN_INT, MAX_INT)
+        return self.rng.random() * self.rng.randint(MIN_INT, MAX_INT)
 
     def value_for_decimalfield(self, field):
         """
@@ -264,8 +1039,8 @@ class Mommy(object):
         """
         md, dp = field.max_digits, field.decimal_places
 
-        md_number = ''.join([str(randint(0, 9)) for i in range(md - dp)])
-        dp_number = ''.join([str(randint(0, 9)) for i in range(dp)])
+        md_number = ''.join([str(self.rng.randint(0, 9)) for i in range(md - dp)])
+        dp_number = ''.join([str(self.rng.randint(0, 9)) for i in range(dp)])
 
         return "%s.%s" % (md_number, dp_number)
 
@@ -277,14 +1052,14 @@ class Mommy(object):
         """
         max_length = field.max_length
 
-        number = randint(MIN_INT, MAX_INT)
+        number = self.rng.randint(MIN_INT, MAX_INT)
         str_number = str(number)
 
         cut_off = len(str_number) - min(len(str_number), max_length)
         rt = str(int(str_number[cut_off:]))
 
-        while (len(rt) < max_length - 1) and not choice(LEAVE_TO_CHANCE):
-            number = randint(MIN_INT, MAX_INT)
+        while (len(rt) < max_length - 1) and not self.rng.choice(LEAVE_TO_CHANCE):
+            number = self.rng.randint(MIN_INT, MAX_INT)
             str_number = str(number)
 
             rt += ","
@@ -330,44 +1105,31 @@ class Mommy(object):
         ref: http://www.comptechdoc.org/independent/networking/guide/netaddressing.html
 
         """
-        ip_address = None
-
-        while True:
-            ip_address = (
-                randint(1, 254), randint(0, 254),
-                randint(0, 254), randint(1, 254))
-
-            if (ip_address[0] == 10) or\
-               (ip_address[0] == 192 and ip_address[1] == 168) or\
-               ((172, 16, 0, 0) <= ip_address <= (172, 31, 255, 255)):
-                continue
-            else:
-                break
-        return '.'.join([str(token) for token in ip_address])
+        return raw_ipv4(rng=self.rng)
 
     def value_for_charfield(self, field):
         """
         Returns a random word with provided max_length.
 
         """
-        length = randint(1, field.max_length)
-        return raw_string(length, LATIN1_TABLE)
+        length = self.rng.randint(1, field.max_length)
+        return raw_string(length, LATIN1_TABLE, self.rng)
 
     def value_for_slugfield(self, field):
         """
         Returns a random slug with provided max_length.
 
         """
-        length = randint(1, field.max_length)
-        return raw_string(length, SLUG_TABLE)
+        length = self.rng.randint(1, field.max_length)
+        return raw_string(length, SLUG_TABLE, self.rng)
 
     def value_for_textfield(self, field):
         """
         Returns a random text with default max_length
 
         """
-        length = randint(1, TEXT_MAX_LENGTH)
-        return raw_string(length, LATIN1_TABLE + '\n')
+        length = self.rng.randint(1, TEXT_MAX_LENGTH)
+        return raw_string(length, TEXT_TABLE, self.rng)
 
     def value_for_xmlfield(self, field):
         """
@@ -381,24 +1143,24 @@ class Mommy(object):
         Returns a random file path
 
         """
-        length = randint(1, field.max_length)
-        return raw_filename(length, FILE_EXT_LIST)
+        length = self.rng.randint(1, field.max_length)
+        return raw_filename(length, FILE_EXT_LIST, self.rng)
 
     def value_for_filepathfield(self, field):
         """
         Returns a random file path
 
         """
-        length = randint(1, field.max_length)
-        return raw_filename(length, FILE_EXT_LIST)
+        length = self.rng.randint(1, field.max_length)
+        return raw_filename(length, FILE_EXT_LIST, self.rng)
 
     def value_for_imagefield(self, field):
         """
         Returns a random image file path
 
         """
-        length = randint(1, field.max_length)
-        return raw_filename(length, IMG_EXT_LIST)
+        length = self.rng.randint(1, field.max_length)
+        return raw_filename(length, IMG_EXT_LIST, self.rng)
 
     def value_for_urlfield(self, field):
         """
@@ -407,8 +1169,8 @@ class Mommy(object):
         """
         assert field.max_length > 8, 'informed max_length for url is too small'
 
-        length = randint(1, field.max_length - 7)
-        return "http://%s" % raw_hostname(length)
+        length = self.rng.randint(1, field.max_length - 7)
+        return "http://%s" % raw_hostname(length, rng=self.rng)
 
     def value_for_emailfield(self, field):
         """
@@ -422,21 +1184,53 @@ class Mommy(object):
         assert max_length >= 3, 'max_length for emailfield is too short'
 
         max_length -= 1  # @
-        local_part_length = randint(1, max_length - 1)  # make sure local part < max_length
-        domain_part_length = randint(1, max_length - local_part_length)
+        local_part_length = self.rng.randint(1, max_length - 1)  # make sure local part < max_length
+        domain_part_length = self.rng.randint(1, max_length - local_part_length)
 
-        local_part = raw_email_localpart(local_part_length)
-        domain_part = raw_hostname(domain_part_length)
+        local_part = raw_email_localpart(local_part_length, self.rng)
+        domain_part = raw_hostname(domain_part_length, rng=self.rng)
         return u"%s@%s" % (local_part, domain_part)
 
+    def get_pool(self, field):
+        """
+        Returns the ParentPool configured for a foreign key field or None.
+
+        """
+        config = self.fk_pool
+        key = (self.model, field.name)  # pools are shared with parent mommies
+
+        if isinstance(config, dict):
+            model = field.related.parent_model
+
+            if field.name in config:
+                config = config[field.name]
+            else:
+                key, config = model, config.get(model)
+
+        if config is None:
+            return None
+
+        if key not in self.pools:
+            if isinstance(config, ParentPool):
+                config = config.copy()
+            else:
+                config = ParentPool(size=config)
+            self.pools[key] = config
+        return self.pools[key]
+
     def value_for_foreignkey(self, field):
         """
         Returns a instance for the field.
+        Instance is taken from the field's parent pool, if any.
 
         """
         if not field.null:
             model = field.related.parent_model
-            base = self.__class__(model)
+            base = self.mommy_for(model)
+            pool = self.get_pool(field)
+
+            if pool is not None:
+                return pool.get(lambda: base.__make(False), self.rng)
             return base.__make(False)
 
     def value_for_onetoonefield(self, field):
@@ -446,7 +1240,7 @@ class Mommy(object):
         """
         if not field.null:
             model = field.related.parent_model
-            base = self.__class__(model)
+            base = self.mommy_for(model)
             return base.__make(False)
 
     def value_for_manytomanyfield(self, field):
@@ -454,4 +1248,161 @@ class Mommy(object):
         Implement this method manually.
 
         """
-        return []
\ No newline at end of file
+        return []
+
+    # batch generators: values_for_<fieldtype>(field, n) returns n values.
+    # They're used by prepare_many and make_many unless the matching
+    # value_for_<fieldtype> is overridden.
+
+    def lengths(self, max_length, n):
+        """
+        Returns n random lengths between 1 and max_length.
+
+        """
+        return [1 + int(self.rng.random() * max_length) for i in xrange(n)]
+
+    def values_for_booleanfield(self, field, n):
+        """
+        Returns n random booleans.
+
+        """
+        return [bool(i) for i in raw_integers(1, 0, n, self.rng)]
+
+    def values_for_nullbooleanfield(self, field, n):
+        """
+        Returns n random booleans, never None.
+
+        """
+        return self.values_for_booleanfield(field, n)
+
+    def values_for_smallintegerfield(self, field, n):
+        """
+        Returns n random integers in the smallint range.
+
+        """
+        return raw_integers(16, MIN_SMALL_INT, n, self.rng)
+
+    def values_for_positivesmallintegerfield(self, field, n):
+        """
+        Returns n random non negative smallints.
+
+        """
+        return raw_integers(15, 0, n, self.rng)
+
+    def values_for_integerfield(self, field, n):
+        """
+        Returns n random integers in the int range.
+
+        """
+        return raw_integers(32, MIN_INT, n, self.rng)
+
+    def values_for_positiveintegerfield(self, field, n):
+        """
+        Returns n random non negative ints.
+
+        """
+        return raw_integers(31, 0, n, self.rng)
+
+    def values_for_bigintegerfield(self, field, n):
+        """
+        Returns n random integers in the bigint range.
+
+        """
+        return raw_integers(64, MIN_BIG_INT, n, self.rng)
+
+    def values_for_floatfield(self, field, n):
+        """
+        Returns n random floats.
+
+        """
+        ints = self.values_for_integerfield(field, n)
+        return [self.rng.random() * i for i in ints]
+
+    def values_for_decimalfield(self, field, n):
+        """
+        Returns n random decimal strings fitting the field.
+
+        """
+        md, dp = field.max_digits, field.decimal_places
+
+        md_numbers = raw_digits(md - dp, n, self.rng)
+        dp_numbers = raw_digits(dp, n, self.rng)
+        return ["%s.%s" % number for number in zip(md_numbers, dp_numbers)]
+
+    def values_for_charfield(self, field, n):
+        """
+        Returns n random strings up to max_length.
+
+        """
+        return raw_strings(self.lengths(field.max_length, n), LATIN1_TABLE, self.rng)
+
+    def values_for_slugfield(self, field, n):
+        """
+        Returns n random slugs up to max_length.
+
+        """
+        return raw_strings(self.lengths(field.max_length, n), SLUG_TABLE, self.rng)
+
+    def values_for_textfield(self, field, n):
+        """
+        Returns n random texts.
+
+        """
+        return raw_strings(self.lengths(TEXT_MAX_LENGTH, n), TEXT_TABLE, self.rng)
+
+    def values_for_urlfield(self, field, n):
+        """
+        Returns n random http urls up to max_length.
+
+        """
+        assert field.max_length > 8, 'informed max_length for url is too small'
+
+        lengths = self.lengths(field.max_length - 7, n)
+        hostnames = raw_hostnames(lengths, rng=self.rng)
+        return ["http://%s" % hostname for hostname in hostnames]
+
+    def values_for_emailfield(self, field, n):
+        """
+        Returns n random emails up to max_length.
+
+        """
+        max_length = field.max_length
+
+        assert max_length >= 3, 'max_length for emailfield is too short'
+
+        max_length -= 1  # @
+        local_part_lengths = self.lengths(max_length - 1, n)
+        domain_part_lengths = [self.rng.randint(1, max_length - length)
+                               for length in local_part_lengths]
+
+        local_parts = raw_email_localparts(local_part_lengths, self.rng)
+        domain_parts = raw_hostnames(domain_part_lengths, rng=self.rng)
+        return [u"%s@%s" % email for email in zip(local_parts, domain_parts)]
+
+    def values_for_ipaddressfield(self, field, n):
+        """
+        Returns n random public IPv4 addresses.
+
+        """
+        return raw_ipv4s(n, rng=self.rng)
+
+    def values_for_datefield(self, field, n):
+        """
+        Returns today n times.
+
+        """
+        return [datetime.date.today()] * n
+
+    def values_for_timefield(self, field, n):
+        """
+        Returns the current datetime n times.
+
+        """
+        return [datetime.datetime.now()] * n
+
+    def values_for_datetimefield(self, field, n):
+        """
+        Returns the current datetime n times.
+
+        """
+        return [datetime.datetime.now()] * n
\ No newline at end of file
@@ -0,0 +1,405 @@
+# -*- coding:utf-8 -*-
+
+__doc__ = '''
+Throughput benchmarks for mommy's generators and make/prepare functions,
+reported as JSON. Run them with runbenchmarks.py.
+'''.strip()
+
+import gc
+import json
+import os
+import platform
+import time
+from datetime import datetime
+from optparse import OptionParser
+from subprocess import PIPE, Popen
+
+import django
+from django.db import connection, reset_queries
+from django.db.models import get_app, get_models
+
+from . import mommy
+from .base import Mommy
+from .profiling import resident_memory
+from .utils import numpy
+
+DEFAULT_QTY = 200
+DEFAULT_THRESHOLD = 0.2  # relative slowdown considered a regression
+MIN_SECONDS = 0.2  # every benchmark is timed at least this long
+MIN_GATED_SAMPLES = 3  # benchmarks with fewer samples never fail the run
+
+
+def measure(func, rows, min_seconds=MIN_SECONDS):
+    """
+    Returns the rows/sec of func, which makes `rows` rows, with the
+    queries/row of its first call and how much the process' resident
+    memory grew while that call's result was still held (None where
+    resident memory can't be told). func is called again until it ran for
+    min_seconds in total, with wall clock time since the database works
+    for it too.
+
+    """
+    gc.collect()
+    reset_queries()
+    memory = resident_memory()
+
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+
+    held = resident_memory()
+    queries = len(connection.queries)
+    del result
+
+    calls = 1
+    while elapsed < min_seconds:
+        start = time.time()
+        func()
+        elapsed += time.time() - start
+        calls += 1
+
+    return {
+        'rows': rows * calls,
+        'seconds': elapsed,
+        'rows_per_sec': rows * calls / max(elapsed, 1e-9),
+        'queries_per_row': queries / float(rows),
+        'memory_kb': None if memory is None else held - memory,
+    }
+
+
+def throughput(func, rows, min_seconds=MIN_SECONDS):
+    """
+    Calls func, which makes `rows` rows, for at least min_seconds of the
+    process' cpu time, so that a sample isn't swayed by the clock's
+    resolution or by other processes. Returns rows/sec.
+
+    """
+    gc.collect()
+    calls = 0
+    start = time.clock()
+
+    while True:
+        func()
+        calls += 1
+        elapsed = time.clock() - start
+
+        if elapsed >= min_seconds:
+            return rows * calls / elapsed
+
+
+def model_zoo():
+    """
+    Returns the test models mommy supports: flat ones, models with foreign
+    keys, one to one and m2m fields, and self referencing ones.
+
+    """
+    models = []
+
+    for model in get_models(get_app('model_mommy')):
+        try:
+            Mommy(model).prepare()
+        except TypeError:  # has unsupported fields
+            continue
+        models.append(model)
+    return models
+
+
+def time_generators(models, qty=DEFAULT_QTY):
+    """
+    Times the generator, and the batch generator, of every field of models.
+    Returns a dict keyed by '<model>.<field>'.
+
+    """
+    results = {}
+
+    for model in models:
+        base = Mommy(model)
+
+        for name, field, generator, null_chance, blank_value, batch \
+                in base.get_plan().steps(False):
+            if generator is None:
+                continue
+
+            results['%s.%s' % (model.__name__, name)] = {
+                'generator': getattr(generator, '__name__',
+                                     generator.__class__.__name__),
+                'rows_per_sec': throughput(
+                    lambda: [generator(base, field) for i in xrange(qty)], qty),
+                'batch_rows_per_sec': throughput(
+                    lambda: batch(base, field, qty), qty),
+            }
+    return results
+
+
+OPERATIONS = (
+    ('make_attrs', lambda model, qty: [mommy.make_attrs(model)
+                                       for i in xrange(qty)]),
+    ('make_attrs_many', lambda model, qty: mommy.make_attrs_many(model, qty)),
+    ('prepare_many', lambda model, qty: mommy.prepare_many(model, qty)),
+    ('make_many', lambda model, qty: mommy.make_many(model, qty)),
+    ('make_many_bulk', lambda model, qty: mommy.make_many(model, qty,
+                                                          bulk=True)),
+)
+
+
+def time_operations(models, qty=DEFAULT_QTY):
+    """
+    Times each of OPERATIONS for models. Returns a dict mapping model names
+    to a dict of measures per operation.
+
+    """
+    results = {}
+
+    for model in models:
+        results[model.__name__] = dict(
+            (name, measure(lambda: operation(model, qty), qty))
+            for name, operation in OPERATIONS)
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'numpy': numpy is not None,
+        'database': connection.vendor,
+        'platform': platform.platform(),
+    }
+
+
+def current_commit():
+    """
+    Returns the git commit of the working copy, suffixed with -dirty if it
+    has changes, or None outside of a git repository.
+
+    """
+    try:
+        process = Popen(['git', 'describe', '--always', '--dirty'],
+                        cwd=os.path.dirname(os.path.abspath(__file__)),
+                        stdout=PIPE, stderr=PIPE)
+    except OSError:  # git is not installed
+        return None
+
+    output = process.communicate()[0].strip()
+    return output if process.returncode == 0 else None
+
+
+def run(models=None, qty=DEFAULT_QTY):
+    """
+    Runs all benchmarks and returns the report as a dict.
+
+    Keyword arguments:
+    models -- models to benchmark. Defaults to the whole model_zoo.
+    qty -- number of rows per measure.
+
+    """
+    if models is None:
+        models = model_zoo()
+
+    debug_cursor = connection.use_debug_cursor
+    connection.use_debug_cursor = True  # records queries, even if not DEBUG
+
+    try:
+        return {
+            'environment': environment(),
+            'qty': qty,
+            'generators': time_generators(models, qty),
+            'operations': time_operations(models, qty),
+        }
+    finally:
+        connection.use_debug_cursor = debug_cursor
+
+
+def quantile(values, q):
+    """
+    Returns the q-th quantile of the sorted list `values`, interpolating
+    between its closest items.
+
+    """
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize(samples):
+    """
+    Returns the median, quartiles and interquartile range of samples, which
+    are less sensitive to outliers, like a run disturbed by another process,
+    than the mean and standard deviation.
+
+    """
+    values = sorted(samples)
+    q1, q3 = quantile(values, 0.25), quantile(values, 0.75)
+
+    return {
+        'median': quantile(values, 0.5),
+        'q1': q1,
+        'q3': q3,
+        'iqr': q3 - q1,
+        'samples': samples,
+    }
+
+
+def benchmark_names(report):
+    """
+    Yields (name, rows/sec) for each benchmark of a report made by run().
+
+    """
+    for key, measures in report['generators'].items():
+        yield 'generators/%s' % key, measures['rows_per_sec']
+        yield 'generators/%s[batch]' % key, measures['batch_rows_per_sec']
+
+    for model, operations in report['operations'].items():
+        for name, measures in operations.items():
+            yield 'operations/%s.%s' % (model, name), measures['rows_per_sec']
+
+
+def collect(models=None, qty=DEFAULT_QTY, repeat=1):
+    """
+    Runs all benchmarks `repeat` times. Returns a history entry: the
+    summary of the rows/sec of every benchmark, with the commit and
+    environment they were measured in.
+
+    """
+    samples = {}
+
+    for i in xrange(repeat):
+        for name, rate in benchmark_names(run(models, qty)):
+            samples.setdefault(name, []).append(rate)
+
+    return {
+        'commit': current_commit(),
+        'environment': environment(),
+        'date': datetime.now().isoformat(),
+        'qty': qty,
+        'repeat': repeat,
+        'results': dict((name, summarize(rates))
+                        for name, rates in samples.items()),
+    }
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as history:
+        return json.load(history)
+
+
+def save_history(path, history):
+    with open(path, 'w') as output:
+        json.dump(history, output, indent=2, sort_keys=True)
+
+
+def find_baseline(history, entry, commit=None):
+    """
+    Returns the latest entry of history measured in the same environment,
+    and with the same qty, as entry. If commit is given, only entries of
+    commits starting with it are considered.
+
+    """
+    for candidate in reversed(history):
+        if candidate['environment'] != entry['environment'] or \
+           candidate['qty'] != entry['qty']:
+            continue
+
+        if commit is None or (candidate['commit'] or '').startswith(commit):
+            return candidate
+    return None
+
+
+def gated(name):
+    """
+    Tells whether a regression of benchmark `name` fails the run: only
+    generators and make_many are gated.
+
+    """
+    return name.startswith('generators/') or '.make_many' in name
+
+
+def compare(baseline, entry, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns (deltas, regressions). deltas maps each benchmark in both
+    entries to the relative change of its median rows/sec. A gated
+    benchmark regressed if its median is more than `threshold` slower and
+    the change is bigger than the noise: its upper quartile is also more
+    than `threshold` below the lower quartile of the baseline, and both
+    entries have at least MIN_GATED_SAMPLES samples.
+
+    """
+    deltas = {}
+    regressions = []
+
+    for name, current in sorted(entry['results'].items()):
+        previous = baseline['results'].get(name)
+
+        if previous is None or not previous['median']:
+            continue
+
+        deltas[name] = current['median'] / previous['median'] - 1
+        samples = min(len(current['samples']), len(previous['samples']))
+
+        if gated(name) and samples >= MIN_GATED_SAMPLES and \
+           deltas[name] < -threshold and \
+           current['q3'] < previous['q1'] * (1 - threshold):
+            regressions.append(name)
+
+    return deltas, regressions
+
+
+def main(argv=None):
+    parser = OptionParser(usage='%prog [options] [model ...]')
+    parser.add_option('-n', '--qty', type='int', default=DEFAULT_QTY,
+                      help='rows per measure [%default]')
+    parser.add_option('-o', '--output', help='write the report to this file')
+    parser.add_option('-r', '--repeat', type='int',
+                      help='runs per benchmark, summarized by their median '
+                           'and interquartile range [5 with --history, '
+                           'else 1]')
+    parser.add_option('--history', help='JSON file with the results of '
+                      'previous runs. Results are compared with the latest '
+                      'ones of the same environment, then added to it.')
+    parser.add_option('--baseline', help='compare with the results of this '
+                      'commit instead of the latest ones')
+    parser.add_option('--threshold', type='float', default=DEFAULT_THRESHOLD,
+                      help='relative slowdown of a generator or make_many '
+                           'failing the run [%default]')
+    options, names = parser.parse_args(argv)
+
+    models = model_zoo()
+    if names:
+        models = [model for model in models if model.__name__ in names]
+
+    repeat = options.repeat or (5 if options.history else 1)
+    regressions = []
+
+    if repeat == 1 and not options.history:
+        report = run(models, options.qty)
+    else:
+        report = collect(models, options.qty, repeat)
+
+        if options.history:
+            history = load_history(options.history)
+            baseline = find_baseline(history, report, options.baseline)
+
+            if baseline is not None:
+                deltas, regressions = compare(baseline, report,
+                                              options.threshold)
+                report['baseline'] = baseline['commit']
+                report['deltas'] = deltas
+                report['regressions'] = regressions
+
+            history.append(dict((key, report[key]) for key in
+                                ('commit', 'environment', 'date', 'qty',
+                                 'repeat', 'results')))
+            save_history(options.history, history)
+
+    report = json.dumps(report, indent=2, sort_keys=True)
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            output.write(report)
+    else:
+        print(report)
+    return 1 if regressions else 0
@@ -0,0 +1,571 @@
+# -*- coding:utf-8 -*-
+
+__doc__ = '''
+Helpers used by mommy to persist many instances with few queries.
+'''.strip()
+
+import sys
+from array import array
+from contextlib import contextmanager
+from Queue import Queue, Full
+from threading import Event, Thread
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, router, \
+    transaction
+from django.db.models import AutoField, ForeignKey, Max, Model
+
+from . import profiling
+
+try:
+    PK_TYPECODE = array('q').typecode
+except ValueError:  # python < 3.3 has no long long arrays
+    PK_TYPECODE = 'l'
+
+
+@contextmanager
+def _joined():
+    yield
+
+
+def atomic(using=None):
+    """
+    Returns a context manager running its block in a transaction.
+
+    django < 1.6 has no atomic blocks; commit_on_success is used instead,
+    unless a transaction is already open, as it would commit it on exit.
+
+    """
+    if hasattr(transaction, 'atomic'):
+        return transaction.atomic(using=using)
+
+    if in_transaction(using):
+        return _joined()
+    return transaction.commit_on_success(using=using)
+
+
+def in_transaction(using=None):
+    """
+    Tells whether a transaction is open on database `using`.
+
+    """
+    if hasattr(transaction, 'atomic'):
+        return connections[using or DEFAULT_DB_ALIAS].in_atomic_block
+    return transaction.is_managed(using=using)
+
+
+def mark_dirty(using=None):
+    """
+    Tells django < 1.6, which only commits transactions the ORM wrote to,
+    that the current transaction was written to with a raw cursor.
+
+    """
+    if not hasattr(transaction, 'atomic'):
+        transaction.set_dirty(using=using)
+
+
+def save_atomically(batches, save, using=None, savepoint_every=None):
+    """
+    Calls save(batch) for every batch in `batches` in a single transaction.
+
+    Keyword arguments:
+    batches -- iterable of lists of items
+    save -- function saving a list of items
+    using -- database alias
+    savepoint_every -- if provided, batches are split in lists of up to
+    savepoint_every items, each saved under its own savepoint. If one of
+    them fails, only it is rolled back: what was saved before is
+    committed and the error is raised after that. Databases without
+    savepoints commit each list in its own transaction instead, which
+    can't be done inside a transaction opened by the caller.
+
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+
+    if savepoint_every and not connection.features.uses_savepoints:
+        if in_transaction(using):
+            raise transaction.TransactionManagementError(
+                '%s has no savepoints, savepoint_every can only be used '
+                'outside of transactions.' % connection.vendor)
+
+        for batch in batches:
+            for part in chunks(batch, savepoint_every):
+                with atomic(using=using):
+                    save(part)
+        return
+
+    error = None
+
+    with atomic(using=using):
+        for batch in batches:
+            if not savepoint_every:
+                save(batch)
+                continue
+
+            for part in chunks(batch, savepoint_every):
+                sid = transaction.savepoint(using=using)
+
+                try:
+                    save(part)
+                except Exception:
+                    transaction.savepoint_rollback(sid, using=using)
+                    error = sys.exc_info()
+                    break
+                else:
+                    transaction.savepoint_commit(sid, using=using)
+
+            if error is not None:
+                break
+
+    if error is not None:
+        raise error[0], error[1], error[2]
+
+
+def chunks(items, size=None):
+    """
+    Splits `items` in lists with up to `size` elements.
+    If size is None, all items are returned in a single list.
+
+    """
+    size = size or len(items) or 1
+
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def compact_pks(pks):
+    """
+    Returns the sequence of primary keys `pks` as an xrange if they are
+    consecutive integers, or unchanged otherwise.
+
+    """
+    if not pks or not isinstance(pks[0], (int, long)):
+        return pks
+
+    first = pks[0]
+    for offset, pk in enumerate(pks):
+        if pk != first + offset:
+            return pks
+    return xrange(first, first + len(pks))
+
+
+def pipelined(items, depth=2):
+    """
+    Yields the items of the iterable `items`, which is consumed by another
+    thread up to `depth` items ahead of the caller. Errors raised while
+    producing items are raised again in the caller's thread.
+
+    Used to generate the next chunk of instances while the current one
+    is written to the database.
+
+    """
+    assert depth >= 1, 'depth must be at least 1'
+
+    queue = Queue(maxsize=depth)
+    stopped = Event()
+    end = object()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except BaseException:
+            put((end, sys.exc_info()))
+        else:
+            put((end, None))
+
+    producer = Thread(target=produce)
+    producer.daemon = True
+    producer.start()
+
+    try:
+        while True:
+            item, error = queue.get()
+
+            if error is not None:
+                raise error[0], error[1], error[2]
+            elif item is end:
+                break
+            yield item
+    finally:
+        stopped.set()  # releases the producer if the caller gives up
+        producer.join()
+
+
+def concurrent_inserts(model, inserted, found):
+    return DatabaseError(
+        'Inserted %d %s rows, found %d new ones: the primary keys of bulk '
+        'inserted rows are unknown when other rows are inserted '
+        'concurrently.' % (inserted, model.__name__, found))
+
+
+def save_quietly(instance, using=None):
+    """
+    Saves instance, with the rows of its parent models, without sending
+    model signals: save_base only sends them for the model it is called
+    with when cls isn't given. django >= 1.6 split save_base, its parts
+    are called instead.
+
+    """
+    model = instance.__class__
+
+    if hasattr(instance, '_save_table'):
+        instance._save_parents(cls=model, using=using, update_fields=None)
+        instance._save_table(cls=model, using=using, update_fields=None)
+        instance._state.db = using
+        instance._state.adding = False
+    else:
+        instance.save_base(cls=model, using=using)
+
+
+def bulk_insert(model, instances, batch_size=None):
+    """
+    Inserts `instances` with one bulk statement per batch, and sets their
+    primary keys. Instances provided with a primary key are inserted on
+    their own; those of integer auto fields are read back right after each
+    batch is inserted, as the rows above the previous max primary key.
+    DatabaseError is raised, and the transaction rolled back, if there
+    are more of those rows than instances: another connection inserted
+    rows meanwhile and the keys can't be told apart.
+
+    Keyword arguments:
+    model -- model class of all instances
+    instances -- list of unsaved model instances
+    batch_size -- max number of instances inserted per statement
+
+    Models inheriting from concrete models have rows in several tables,
+    which bulk_create can't insert: they are saved one by one, still
+    without sending model signals.
+
+    """
+    using = router.db_for_write(model)
+    manager = model._default_manager.db_manager(using)
+    recover_pks = isinstance(model._meta.pk, AutoField)
+
+    if model._meta.parents:
+        with atomic(using=using):
+            for instance in instances:
+                save_quietly(instance, using)
+        return instances
+
+    # there's no multi row insert for tables without any column but the pk,
+    # those rows are inserted one by one, still without calling save()
+    if not [f for f in model._meta.local_fields if not isinstance(f, AutoField)]:
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        table, column = model._meta.db_table, model._meta.pk.column
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            qn(table), qn(column), connection.ops.pk_default_value())
+
+        with atomic(using=using):
+            mark_dirty(using)
+            cursor = connection.cursor()
+
+            for instance in instances:
+                cursor.execute(sql)
+                instance.pk = connection.ops.last_insert_id(cursor, table, column)
+                instance._state.adding = False
+                instance._state.db = using
+        return instances
+
+    with atomic(using=using):
+        for batch in chunks(instances, batch_size):
+            missing_pks = [i for i in batch if i.pk is None]
+
+            if not recover_pks or not missing_pks:
+                manager.bulk_create(batch)
+            else:
+                if len(missing_pks) < len(batch):
+                    manager.bulk_create([i for i in batch if i.pk is not None])
+
+                last_pk = manager.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+                manager.bulk_create(missing_pks)
+
+                pks = manager.filter(pk__gt=last_pk).order_by('pk')\
+                    .values_list('pk', flat=True)
+                pks = list(pks[:len(missing_pks) + 1])
+
+                if len(pks) != len(missing_pks):
+                    raise concurrent_inserts(model, len(missing_pks), len(pks))
+
+                for instance, pk in zip(missing_pks, pks):
+                    instance.pk = pk
+
+            for instance in batch:
+                instance._state.adding = False
+                instance._state.db = using
+
+    return instances
+
+
+class RawValues(object):
+    """
+    Stands for a model instance in Field.pre_save, which sets the value
+    of auto_now fields on it.
+
+    """
+
+
+def raw_insert(model, rows, batch_size=None):
+    """
+    Inserts `rows`, dicts of field values, with cursor.executemany, without
+    creating model instances. Values are converted with each field's
+    get_db_prep_save; fields missing from a row get their default, and
+    auto_now and auto_now_add fields the current date or time. Returns
+    the primary keys of each batch: an xrange when they are contiguous,
+    a list otherwise. As in bulk_insert, DatabaseError is raised if other
+    rows are inserted concurrently.
+
+    Keyword arguments:
+    model -- model class of the rows. Models inheriting from concrete
+    models are not supported.
+    rows -- list of dicts mapping field names (or attnames) to values.
+    Related instances must be saved already.
+    batch_size -- max number of rows per executemany call
+
+    """
+    assert not model._meta.parents, 'raw inserts need a single table model'
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = model._meta
+    pk = opts.pk
+    auto_pk = isinstance(pk, AutoField)
+
+    fields = [f for f in opts.local_fields if not (auto_pk and f is pk)]
+    placeholders = ['%s'] * len(fields)
+
+    if not fields:  # no column but the pk; the database picks its value
+        placeholders = [connection.ops.pk_default_value()]
+
+    sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+        qn(opts.db_table),
+        ', '.join(qn(f.column) for f in fields or [pk]),
+        ', '.join(placeholders))
+    last_pk_sql = 'SELECT MAX(%s) FROM %s' % (qn(pk.column), qn(opts.db_table))
+    new_rows_sql = 'SELECT COUNT(*), MAX(%s) FROM %s WHERE %s > %%s' % (
+        qn(pk.column), qn(opts.db_table), qn(pk.column))
+
+    auto_now = [f for f in fields if getattr(f, 'auto_now', False) or
+                getattr(f, 'auto_now_add', False)]
+    missing = object()
+    now = {}
+
+    def prepare(field, row):
+        if field in now:
+            return now[field]
+
+        value = row.get(field.name, missing)
+
+        if value is missing:
+            value = row.get(field.attname, missing)
+
+        if value is missing:
+            value = field.get_default()
+        elif isinstance(value, Model):
+            value = value.pk
+        return field.get_db_prep_save(value, connection=connection)
+
+    pk_batches = []
+    cursor = connection.cursor()
+
+    with atomic(using=using):
+        mark_dirty(using)
+
+        for batch in chunks(rows, batch_size):
+            now.clear()
+            for field in auto_now:  # what save() would set, once per batch
+                now[field] = field.get_db_prep_save(
+                    field.pre_save(RawValues(), True), connection=connection)
+
+            params = [[prepare(f, row) for f in fields] for row in batch]
+
+            if not auto_pk:
+                cursor.executemany(sql, params)
+                pk_batches.append([prepare(pk, row) for row in batch])
+                continue
+
+            cursor.execute(last_pk_sql)
+            last_pk = cursor.fetchone()[0] or 0
+            cursor.executemany(sql, params)
+            cursor.execute(new_rows_sql, [last_pk])
+            new_rows, new_last_pk = cursor.fetchone()
+
+            if new_rows != len(batch):
+                raise concurrent_inserts(model, len(batch), new_rows)
+            elif new_last_pk - last_pk == len(batch):
+                pk_batches.append(xrange(last_pk + 1, new_last_pk + 1))
+            else:
+                pk_batches.append(list(model._default_manager.db_manager(using)
+                    .filter(pk__gt=last_pk).order_by('pk')
+                    .values_list('pk', flat=True)))
+
+    return pk_batches
+
+
+def bulk_link(field, links, batch_size=None):
+    """
+    Adds m2m values to many instances at once, with one bulk insert per batch
+    into the field's auto created through model. Returns False, doing
+    nothing, if the through model was declared by the user.
+
+    Keyword arguments:
+    field -- ManyToManyField of the instances' model
+    links -- list of (instance, values) pairs; values are instances or pks
+    batch_size -- max number of through rows per bulk insert
+
+    """
+    through = field.rel.through
+
+    if not through._meta.auto_created:
+        return False
+
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+    pairs = set()
+    for instance, values in links:
+        for value in values:
+            value = getattr(value, 'pk', value)
+            pairs.add((instance.pk, value))
+
+            if field.rel.symmetrical:  # self referencing m2m goes both ways
+                pairs.add((value, instance.pk))
+
+    rows = [through(**{source: s, target: t}) for s, t in sorted(pairs)]
+    using = router.db_for_write(through)
+    manager = through._default_manager.db_manager(using)
+
+    with atomic(using=using):
+        for batch in chunks(rows, batch_size):
+            manager.bulk_create(batch)
+    return True
+
+
+class ObjectGraph(object):
+    """
+    Unsaved instances and the unsaved parents (foreign keys and one to one
+    fields) they point to, grouped by level: instances of a level only
+    depend on instances of lower levels.
+
+    """
+    related_fields = {}  # model -> foreign key fields
+
+    def __init__(self, instances=()):
+        self.levels = {}  # id(instance) -> level
+        self.batches = {}  # (level, model) -> instances
+        self.order = []  # batch keys, in discovery order
+
+        for instance in instances:
+            self.add(instance)
+
+    @classmethod
+    def get_related_fields(cls, model):
+        fields = cls.related_fields.get(model)
+
+        if fields is None:
+            fields = cls.related_fields[model] = [
+                f for f in model._meta.fields if isinstance(f, ForeignKey)]
+        return fields
+
+    def parents(self, instance):
+        """
+        Yields (field, parent) for every related instance not yet saved.
+
+        """
+        for field in self.get_related_fields(instance.__class__):
+            parent = getattr(instance, field.get_cache_name(), None)
+
+            if parent is not None and parent._state.adding:
+                yield field, parent
+
+    def add(self, instance):
+        """
+        Adds instance and its unsaved ancestors to the graph.
+        Returns the level of instance.
+
+        """
+        key = id(instance)
+
+        if key in self.levels:
+            return self.levels[key]
+
+        self.levels[key] = level = 0  # guards against reference cycles
+
+        for field, parent in self.parents(instance):
+            level = max(level, self.add(parent) + 1)
+        self.levels[key] = level
+
+        batch_key = (level, instance.__class__)
+
+        if batch_key not in self.batches:
+            self.batches[batch_key] = []
+            self.order.append(batch_key)
+        self.batches[batch_key].append(instance)
+        return level
+
+    def __iter__(self):
+        """
+        Yields (model, instances) in an order safe for insertion.
+
+        """
+        for key in sorted(self.order, key=lambda k: k[0]):
+            yield key[1], self.batches[key]
+
+    def bind_parents(self, instance):
+        """
+        Copies the primary keys of saved parents into instance.
+
+        """
+        for field in self.get_related_fields(instance.__class__):
+            parent = getattr(instance, field.get_cache_name(), None)
+
+            if parent is not None:
+                setattr(instance, field.attname, parent.pk)
+
+
+def persist(instances, bulk=False, batch_size=None, on_batch=None):
+    """
+    Saves `instances` and all their unsaved ancestors, parents first.
+
+    Keyword arguments:
+    instances -- list of unsaved model instances
+    bulk -- insert each model of each level with bulk statements instead
+    of calling save() per instance. No model signal is sent for them.
+    batch_size -- max number of instances per bulk insert
+    on_batch -- function called as on_batch(model, instances) after each
+    list of instances of the same model is saved
+
+    """
+    graph = ObjectGraph(instances)
+    stats = profiling.active
+
+    for model, batch in graph:
+        start = stats and profiling.timer()
+
+        for instance in batch:
+            graph.bind_parents(instance)
+
+        if bulk:
+            bulk_insert(model, batch, batch_size)
+        else:
+            for instance in batch:
+                instance.save()
+
+        if stats is not None:
+            stats.add_phase(model, 'save', profiling.timer() - start, len(batch))
+
+        if on_batch is not None:
+            on_batch(model, batch)
+
+    return instances
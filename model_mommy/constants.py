@@ -8,9 +8,14 @@ ASCII_RANGE = (0, 127)
 LATIN1_TABLE = u''.join([unichr(i) for i in range(256)])
 ASCII_TABLE = LATIN1_TABLE[:128]
 SLUG_TABLE = string.ascii_lowercase + string.digits + "-_"
+HOSTNAME_TABLE = string.ascii_letters + string.digits  # plus '-' inside labels
+EMAIL_LOCALPART_TABLE = string.ascii_letters + string.digits + "!#$%&'*+-/=?^_`{|}~"  # plus '.'
+TEXT_TABLE = LATIN1_TABLE[1:] + u'\n'  # 256 chars, no NUL
 
 LEAVE_TO_CHANCE = (True, False, False, False)  # +- 25% chance
 TEXT_MAX_LENGTH = 500
+CHUNK_SIZE = 1000  # instances generated at a time by iter_make/iter_prepare
+WORKER_CHUNK_SIZE = 100  # instances prepared per make_many worker task
 MIN_INT, MAX_INT = -2147483648, 2147483647
 MIN_BIG_INT, MAX_BIG_INT = -9223372036854775808l, 9223372036854775807l
 MIN_SMALL_INT, MAX_SMALL_INT = -32768, 32767
@@ -1,6 +1,10 @@
 # -*- coding:utf-8 -*-
 
-from .base import Mommy
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .base import Mommy, ParentPool
+from .constants import CHUNK_SIZE
+from .profiling import Stats, count_queries, profile
 
 
 def make_one(model, **attrs):
@@ -13,13 +17,23 @@ def make_one(model, **attrs):
     Keyword arguments:
     fill_null -- set to True and no field shall be null. Set to false for
     otherwise. Do not set and some null fields will be null, some won't.
+    seed -- seed for the random values. The same seed (and attrs) gives
+    the same data.
+    signals -- set to False to insert the instance and its parents without
+    sending model signals. See make_many.
+    on_batch -- function called as on_batch(model, instances) after
+    each group of instances of the same model is saved.
 
     """
     fill_null = None
     if 'fill_null' in attrs:
         fill_null = attrs.pop('fill_null')
+    seed = attrs.pop('seed', None)
+    signals = attrs.pop('signals', True)
+    on_batch = attrs.pop('on_batch', None)
 
-    mommy = Mommy(model, fill_null=fill_null)
+    mommy = Mommy(model, fill_null=fill_null, seed=seed, signals=signals,
+                  on_batch=on_batch)
     return mommy.make(**attrs)
 
 
@@ -34,19 +48,22 @@ def prepare_one(model, **attrs):
     Keyword arguments:
     fill_null -- set to True and no field shall be null. Set to false for
     otherwise. Do not set and some null fields will be null, some won't.
+    seed -- seed for the random values. The same seed (and attrs) gives
+    the same data.
 
     """
     fill_null = None
     if 'fill_null' in attrs:
         fill_null = attrs.pop('fill_null')
+    seed = attrs.pop('seed', None)
 
-    mommy = Mommy(model, fill_null=fill_null)
+    mommy = Mommy(model, fill_null=fill_null, seed=seed)
     return mommy.prepare(**attrs)
 
 
 def make_many(model, qty=5, **attrs):
     """
-    Thin wrapper around make_one. Makes a list of model instances.
+    Makes a list of model instances.
 
     Fields from the model instance are filled with random valid data
     according with each type.
@@ -55,15 +72,83 @@ def make_many(model, qty=5, **attrs):
     fill_null -- set to True and no field shall be null. Set to false for
     otherwise. Do not set and some null fields will be null, some won't.
     qty -- how many instances you want.
+    bulk -- set to True to persist instances with bulk inserts instead of
+    one save() per instance. Primary keys are set where the backend allows.
+    Models using multi-table inheritance can't be bulk inserted, so their
+    rows are inserted one instance at a time, still without calling save().
+    batch_size -- max number of instances per bulk insert.
+    workers -- prepare instances in this many processes, then bulk insert
+    them from the current one.
+    pipeline -- prepare instances in another thread while the previous
+    ones are bulk inserted.
+    queue_depth -- max number of prepared chunks waiting to be inserted,
+    at least 1.
+    atomic -- save everything in a single transaction.
+    savepoint_every -- add a savepoint every this many instances, so an
+    error only rolls back the instances after the last one. On databases
+    without savepoints, each part is committed on its own instead.
+    fk_pool -- reuse parents for foreign keys instead of creating one per
+    instance. See Mommy and ParentPool.
+    seed -- seed for the random values. The same seed (and attrs) gives
+    the same data.
+    signals -- set to False to insert instances, parents and m2m links
+    with bulk statements, without sending any model signal.
+    on_batch -- function called as on_batch(model, instances) once per
+    group of instances of the same model saved together, e.g. to update
+    a search index in one go instead of from a post_save receiver.
+    returning -- 'instances' (the default) to get the list of instances,
+    'pk' to get their primary keys only (an xrange when contiguous) or None
+    to get how many were made. Saves memory for millions of rows.
 
     """
-    return [make_one(model, **attrs) for i in range(qty)]
+    fill_null = attrs.pop('fill_null', None)
+    fk_pool = attrs.pop('fk_pool', None)
+    seed = attrs.pop('seed', None)
+    signals = attrs.pop('signals', True)
+    on_batch = attrs.pop('on_batch', None)
+    bulk = attrs.pop('bulk', False)
+    batch_size = attrs.pop('batch_size', None)
+    workers = attrs.pop('workers', None)
+    pipeline = attrs.pop('pipeline', False)
+    queue_depth = attrs.pop('queue_depth', 2)
+    atomic = attrs.pop('atomic', False)
+    savepoint_every = attrs.pop('savepoint_every', None)
+    returning = attrs.pop('returning', 'instances')
+
+    mommy = Mommy(model, fill_null=fill_null, fk_pool=fk_pool, seed=seed,
+                  signals=signals, on_batch=on_batch)
+    return mommy.make_many(qty, bulk=bulk, batch_size=batch_size,
+                           workers=workers, pipeline=pipeline,
+                           queue_depth=queue_depth, atomic=atomic,
+                           savepoint_every=savepoint_every,
+                           returning=returning, **attrs)
+
+
+def load_many(model, qty=5, **attrs):
+    """
+    Inserts rows of a model with executemany, without creating model
+    instances nor calling save(). Much faster than make_many when only
+    the data matters. Returns the primary keys of each inserted batch,
+    as xranges when they are contiguous.
+
+    Keyword arguments:
+    qty -- how many rows you want.
+    batch_size -- max number of rows per executemany call.
+    fill_null, fk_pool, seed -- see make_many.
+
+    """
+    fill_null = attrs.pop('fill_null', None)
+    fk_pool = attrs.pop('fk_pool', None)
+    seed = attrs.pop('seed', None)
+    batch_size = attrs.pop('batch_size', None)
+
+    mommy = Mommy(model, fill_null=fill_null, fk_pool=fk_pool, seed=seed)
+    return mommy.load_many(qty, batch_size=batch_size, **attrs)
 
 
 def prepare_many(model, qty=5, **attrs):
     """
-    Thin wrapper around prepare_one. Makes a list of model instances,
-    but do not persist any.
+    Makes a list of model instances, but do not persist any.
 
     Fields from the model instance are filled with random valid data
     according with each type.
@@ -72,9 +157,64 @@ def prepare_many(model, qty=5, **attrs):
     fill_null -- set to True and no field shall be null. Set to false for
     otherwise. Do not set and some null fields will be null, some won't.
     qty -- how many instances you want.
+    fk_pool -- reuse parents for foreign keys instead of creating one per
+    instance. See Mommy and ParentPool.
+    seed -- seed for the random values. The same seed (and attrs) gives
+    the same data.
 
     """
-    return [prepare_one(model, **attrs) for i in range(qty)]
+    fill_null = attrs.pop('fill_null', None)
+    fk_pool = attrs.pop('fk_pool', None)
+    seed = attrs.pop('seed', None)
+
+    mommy = Mommy(model, fill_null=fill_null, fk_pool=fk_pool, seed=seed)
+    return mommy.prepare_many(qty, **attrs)
+
+
+def iter_make(model, qty=5, **attrs):
+    """
+    Same as make_many, but instances are yielded instead of returned in a
+    list. They are generated and bulk inserted a chunk at a time, so
+    memory use doesn't grow with qty. Like make_many(bulk=True), rows go
+    through bulk_create and the model's save() method is never called.
+
+    Keyword arguments:
+    qty -- how many instances you want.
+    chunk_size -- number of instances generated and inserted together.
+    batch_size -- max number of instances per bulk insert.
+    fill_null, fk_pool, seed, on_batch -- see make_many.
+
+    """
+    fill_null = attrs.pop('fill_null', None)
+    fk_pool = attrs.pop('fk_pool', None)
+    seed = attrs.pop('seed', None)
+    on_batch = attrs.pop('on_batch', None)
+    chunk_size = attrs.pop('chunk_size', CHUNK_SIZE)
+    batch_size = attrs.pop('batch_size', None)
+
+    mommy = Mommy(model, fill_null=fill_null, fk_pool=fk_pool, seed=seed,
+                  on_batch=on_batch)
+    return mommy.iter_make(qty, chunk_size=chunk_size, batch_size=batch_size, **attrs)
+
+
+def iter_prepare(model, qty=5, **attrs):
+    """
+    Same as prepare_many, but instances are yielded instead of returned
+    in a list, as they are generated a chunk at a time.
+
+    Keyword arguments:
+    qty -- how many instances you want.
+    chunk_size -- number of instances generated together.
+    fill_null, fk_pool, seed -- see prepare_many.
+
+    """
+    fill_null = attrs.pop('fill_null', None)
+    fk_pool = attrs.pop('fk_pool', None)
+    seed = attrs.pop('seed', None)
+    chunk_size = attrs.pop('chunk_size', CHUNK_SIZE)
+
+    mommy = Mommy(model, fill_null=fill_null, fk_pool=fk_pool, seed=seed)
+    return mommy.iter_prepare(qty, chunk_size=chunk_size, **attrs)
 
 
 def make_attrs(model, **attrs):
@@ -85,11 +225,68 @@ def make_attrs(model, **attrs):
     Keyword arguments:
     fill_null -- set to True and no field shall be null. Set to false for
     otherwise. Do not set and some null fields will be null, some won't.
+    seed -- seed for the random values. The same seed (and attrs) gives
+    the same data.
 
     """
     fill_null = None
     if 'fill_null' in attrs:
         fill_null = attrs.pop('fill_null')
+    seed = attrs.pop('seed', None)
+
+    mommy = Mommy(model, fill_null, seed=seed)
+    return mommy.attrs(True, **attrs)
+
+
+def make_attrs_many(model, qty=5, layout='rows', **attrs):
+    """
+    Same as make_attrs, for `qty` instances at once.
+
+    Keyword arguments:
+    qty -- how many instances you want attributes for.
+    layout -- 'rows' returns a list of dicts, one per instance. 'columns'
+    returns a dict mapping field names to lists of values, None where a
+    field was left null.
+    fill_null, seed -- see make_attrs.
+
+    """
+    fill_null = attrs.pop('fill_null', None)
+    seed = attrs.pop('seed', None)
+
+    mommy = Mommy(model, fill_null, seed=seed)
+    return mommy.attrs_many(qty, True, layout=layout, **attrs)
+
+
+def dump_attrs_many(model, stream, qty=5, layout='rows', **attrs):
+    """
+    Writes the attributes of `qty` instances to `stream` as JSON lines,
+    generating them a chunk at a time. Returns the number of lines.
+
+    Keyword arguments:
+    stream -- file like object to write to.
+    qty -- how many instances you want attributes for.
+    layout -- 'rows' writes a line per instance. 'columns' writes a line
+    per chunk, mapping field names to lists of values.
+    chunk_size -- number of instances generated together.
+    fill_null, seed -- see make_attrs.
+
+    """
+    fill_null = attrs.pop('fill_null', None)
+    seed = attrs.pop('seed', None)
+    chunk_size = attrs.pop('chunk_size', CHUNK_SIZE)
+
+    mommy = Mommy(model, fill_null, seed=seed)
+    encode = DjangoJSONEncoder().encode
+    lines = 0
+
+    for start in xrange(0, qty, chunk_size):
+        size = min(chunk_size, qty - start)
+        chunk = mommy.attrs_many(size, True, layout=layout, **attrs)
+
+        if layout == 'columns':
+            chunk = [chunk]
+
+        stream.write(''.join(encode(item) + '\n' for item in chunk))
+        lines += len(chunk)
 
-    mommy = Mommy(model, fill_null)
-    return mommy.attrs(True, **attrs)
\ No newline at end of file
+    return lines
@@ -0,0 +1,347 @@
+# -*- coding:utf-8 -*-
+
+__doc__ = '''
+Opt-in timing of where mommy spends its time, and memory, per model, field
+and phase, and accounting of the queries it runs. See mommy.profile and
+mommy.count_queries.
+'''.strip()
+
+import re
+import sys
+from contextlib import contextmanager
+from timeit import default_timer as timer
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import get_models
+
+try:
+    import resource
+except ImportError:
+    resource = None  # not available on windows
+
+PHASES = ('generate', 'construct', 'save', 'm2m')
+PAGE_SIZE = resource.getpagesize() if resource is not None else 4096
+
+active = None  # Stats being recorded, if any
+
+
+def resident_memory():
+    """
+    Returns the resident memory of the process right now, in kilobytes,
+    or None where it can't be told (without /proc).
+
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+    return pages * PAGE_SIZE // 1024
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of the process so far, in kilobytes,
+    or None where it can't be told.
+
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # bytes instead of kilobytes
+        peak //= 1024
+    return peak
+
+
+class Stats(object):
+    """
+    Cumulative time and number of values (or instances) per model and
+    field, and per model and phase:
+    generate -- creating field values, parents of foreign keys included
+    construct -- creating model instances from their values
+    save -- inserting instances, one model at a time
+    m2m -- adding m2m values
+
+    The time of a foreign key field includes the making of its parent, whose
+    fields are also recorded under the parent's model.
+
+    If memory is True, the bytes of generated values are recorded per
+    model and field, with the name of the field's generator, along with the
+    growth of the process' resident memory over the profile block and how
+    far above the block's starting resident memory its peak went. Sizes
+    are those of sys.getsizeof: a foreign key's parent is not counted in
+    the field, its own fields are recorded under the parent's model.
+
+    """
+    def __init__(self, memory=False):
+        self.fields = {}  # (model, field name) -> [count, seconds]
+        self.phases = {}  # (model, phase) -> [count, seconds]
+
+        self.memory = memory
+        self.field_bytes = {}  # (model, field name) -> [generator, bytes]
+        self.rss_growth_kb = None
+        self.peak_rss_growth_kb = None  # None if the peak didn't rise
+
+    def add_field(self, model, name, seconds, count=1):
+        entry = self.fields.setdefault((model, name), [0, 0.0])
+        entry[0] += count
+        entry[1] += seconds
+
+    def add_phase(self, model, phase, seconds, count=1):
+        entry = self.phases.setdefault((model, phase), [0, 0.0])
+        entry[0] += count
+        entry[1] += seconds
+
+    def add_field_bytes(self, model, name, generator, size):
+        entry = self.field_bytes.get((model, name))
+
+        if entry is None:
+            entry = self.field_bytes[model, name] = [
+                getattr(generator, '__name__', generator.__class__.__name__), 0]
+        entry[1] += size
+
+    def generator_bytes(self):
+        """
+        Returns a dict mapping generator names to the bytes of the values
+        they generated, all models and fields included.
+
+        """
+        totals = {}
+
+        for generator, size in self.field_bytes.values():
+            totals[generator] = totals.get(generator, 0) + size
+        return totals
+
+    def as_dict(self):
+        """
+        Returns the stats keyed by '<model>.<field>' and '<model>:<phase>'.
+
+        """
+        def entries(table, separator):
+            return dict(
+                ('%s%s%s' % (model.__name__, separator, name),
+                 {'count': count, 'seconds': seconds})
+                for (model, name), (count, seconds) in table.items())
+
+        stats = {'fields': entries(self.fields, '.'),
+                 'phases': entries(self.phases, ':')}
+
+        if self.memory:
+            stats['memory'] = {
+                'rss_growth_kb': self.rss_growth_kb,
+                'peak_rss_growth_kb': self.peak_rss_growth_kb,
+                'fields': dict(
+                    ('%s.%s' % (model.__name__, name),
+                     {'generator': generator, 'bytes': size})
+                    for (model, name), (generator, size)
+                    in self.field_bytes.items()),
+                'generators': self.generator_bytes(),
+            }
+        return stats
+
+    def __str__(self):
+        rows = []
+
+        for title, table in (('phase', self.phases), ('field', self.fields)):
+            for (model, name), (count, seconds) in table.items():
+                rows.append((seconds, title, '%s.%s' % (model.__name__, name),
+                             count))
+
+        lines = ['%-6s %-40s %10s %10s' % ('', 'name', 'count', 'seconds')]
+        for seconds, title, name, count in sorted(rows, reverse=True):
+            lines.append('%-6s %-40s %10d %10.4f' % (title, name, count, seconds))
+
+        if self.memory:
+            lines.append('')
+            lines.append('rss grown by %s kb, peak rss %s' % (
+                self.rss_growth_kb,
+                'not above the earlier peak' if self.peak_rss_growth_kb is None
+                else 'grown by %s kb' % self.peak_rss_growth_kb))
+            lines.append('%-6s %-40s %-30s %10s' % (
+                '', 'name', 'generator', 'bytes'))
+
+            for (model, name), (generator, size) in sorted(
+                    self.field_bytes.items(), key=lambda item: -item[1][1]):
+                lines.append('%-6s %-40s %-30s %10d' % (
+                    'field', '%s.%s' % (model.__name__, name), generator, size))
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile(stats=None, memory=False):
+    """
+    Records mommy's stats while the block runs and yields them. Profiling
+    blocks can be nested; the inner one collects its own stats.
+
+    Stats are shared by all threads of the process, pipelined generation
+    included, but values prepared by worker processes are not recorded.
+
+    Keyword arguments:
+    stats -- Stats to add to. A new one is created if not provided.
+    memory -- record memory use too. See Stats.
+
+    """
+    global active
+
+    if stats is None:
+        stats = Stats(memory=memory)
+
+    previous = active
+    active = stats
+
+    if stats.memory:
+        start_rss = resident_memory()
+        start_peak = peak_memory()
+
+    try:
+        yield stats
+    finally:
+        active = previous
+
+        if stats.memory:
+            end_rss = resident_memory()
+            end_peak = peak_memory()
+
+            if start_rss is not None and end_rss is not None:
+                stats.rss_growth_kb = end_rss - start_rss
+
+                # ru_maxrss is the peak of the whole process, it only tells
+                # about the block when the block raised it
+                if end_peak is not None and end_peak > start_peak:
+                    stats.peak_rss_growth_kb = end_peak - start_rss
+
+
+# "INSERT INTO "table" ...", "SELECT ... FROM "table" ...", and so on
+TABLE_PATTERN = re.compile(
+    r'(?:INSERT\s+INTO|FROM|UPDATE)\s+["`\[]?(\w+)', re.IGNORECASE)
+# executemany statements are logged as "<n> times: <sql>"
+EXECUTEMANY_PREFIX = re.compile(r'^(?:\d+|\?) times: ')
+
+
+def table_labels():
+    """
+    Returns a dict mapping database tables to the name of their model, or
+    '<model>.<field>' for tables of auto created m2m through models.
+
+    """
+    labels = {}
+
+    for model in get_models(include_auto_created=True):
+        labels[model._meta.db_table] = model.__name__
+
+        for field in model._meta.local_many_to_many:
+            through = field.rel.through
+
+            if not isinstance(through, basestring) and \
+               through._meta.auto_created:
+                labels[through._meta.db_table] = '%s.%s' % (
+                    model.__name__, field.name)
+    return labels
+
+
+class QueryReport(object):
+    """
+    Queries run in a count_queries block, counted per model and statement
+    (INSERT, SELECT, UPDATE, DELETE or OTHER). Statements on m2m tables are
+    counted under '<model>.<field>'. An executemany call counts as one
+    statement.
+
+    Attributes:
+    statements -- the SQL of each query, in order
+    counts -- dict mapping labels to {statement: count}
+    bytes -- size of all SQL, utf-8 encoded
+
+    """
+    def __init__(self):
+        self.statements = []
+        self.counts = {}
+        self.bytes = 0
+
+    def add(self, sql, labels):
+        sql = EXECUTEMANY_PREFIX.sub('', sql)
+        verb = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+
+        if verb not in ('INSERT', 'SELECT', 'UPDATE', 'DELETE'):
+            verb = 'OTHER'
+
+        match = TABLE_PATTERN.search(sql)
+        label = labels.get(match.group(1), match.group(1)) if match else None
+
+        counts = self.counts.setdefault(label, {})
+        counts[verb] = counts.get(verb, 0) + 1
+
+        self.statements.append(sql)
+        if isinstance(sql, unicode):
+            sql = sql.encode('utf-8')
+        self.bytes += len(sql)
+
+    @property
+    def total(self):
+        return len(self.statements)
+
+    def count(self, verb=None, label=None):
+        """
+        Returns the number of statements of a verb and/or label (a model
+        name, or '<model>.<field>' for m2m tables).
+
+        """
+        return sum(n for key, counts in self.counts.items()
+                   if label is None or key == label
+                   for name, n in counts.items()
+                   if verb is None or name == verb)
+
+    @property
+    def m2m(self):
+        """
+        Number of statements on m2m tables.
+
+        """
+        return sum(sum(counts.values()) for key, counts in self.counts.items()
+                   if key and '.' in key)
+
+    def as_dict(self):
+        return {'total': self.total, 'bytes': self.bytes, 'm2m': self.m2m,
+                'counts': dict((str(key), counts)
+                               for key, counts in self.counts.items())}
+
+    def __str__(self):
+        lines = ['%d queries, %d bytes of SQL' % (self.total, self.bytes)]
+
+        for label, counts in sorted(self.counts.items()):
+            lines.append('%-40s %s' % (label, ', '.join(
+                '%s: %d' % item for item in sorted(counts.items()))))
+        return '\n'.join(lines)
+
+
+@contextmanager
+def count_queries(using=DEFAULT_DB_ALIAS, max_queries=None):
+    """
+    Yields a QueryReport of the queries run on database `using` while the
+    block runs. Queries are logged by the connection's debug cursor, which
+    is enabled for the block even if settings.DEBUG is False.
+
+    Keyword arguments:
+    using -- database alias
+    max_queries -- if provided, AssertionError is raised when the block
+    runs more queries than this.
+
+    """
+    connection = connections[using]
+    debug_cursor = connection.use_debug_cursor
+    connection.use_debug_cursor = True
+    start = len(connection.queries)
+    report = QueryReport()
+
+    try:
+        yield report
+    finally:
+        connection.use_debug_cursor = debug_cursor
+        labels = table_labels()
+
+        for query in connection.queries[start:]:
+            report.add(query['sql'], labels)
+
+    if max_queries is not None and report.total > max_queries:
+        raise AssertionError('%d queries run, %d expected at most\n%s' % (
+            report.total, max_queries, report))
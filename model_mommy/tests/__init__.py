@@ -3,4 +3,7 @@ from test_utils import *
 from test_mommy import *
 from test_fields import *
 from test_related import *
-from test_extending_mommy import *
\ No newline at end of file
+from test_extending_mommy import *
+from test_bulk import *
+from test_benchmark import *
+from test_profiling import *
\ No newline at end of file
@@ -36,6 +36,19 @@ class Dog(models.Model):
     breed = CharField(max_length=50)
 
 
+class Kennel(models.Model):
+    dog = ForeignKey('Dog')
+    name = CharField(max_length=30)
+
+
+class Pet(models.Model):
+    name = CharField(max_length=30)
+
+
+class Cat(Pet):  # multi-table inheritance
+    lives = IntegerField()
+
+
 class Store(models.Model):
     customers = ManyToManyField(Person, related_name='favorite_stores',
         blank=True, null=True)
@@ -66,6 +79,11 @@ class DummyTimeModel(models.Model):
     time_field = TimeField()
 
 
+class DummyAutoNowModel(models.Model):
+    created = DateTimeField(auto_now_add=True)
+    updated = DateField(auto_now=True)
+
+
 class DummySlugModel(models.Model):
     slug_field = models.SlugField()
 
@@ -150,6 +168,19 @@ class DummyM2MModel(models.Model):
         related_name='relation')
 
 
+class CountryCodeField(CharField):
+    description = "A CharField subclass mommy has no generator for"
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', 2)
+        super(CountryCodeField, self).__init__(*args, **kwargs)
+
+
+class DummyCustomFieldModel(models.Model):
+    country = CountryCodeField()
+    friendliest_country = CountryCodeField()
+
+
 class UnsupportedField(Field):
     description = "I'm bad company, mommy doesn't know me"
 
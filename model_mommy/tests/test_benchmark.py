@@ -0,0 +1,116 @@
+# -*- coding:utf-8 -*-
+
+from django.test import TestCase
+
+
+class TestBenchmarkReport(TestCase):
+    def test_report_measures_generators_and_operations(self):
+        from model_mommy import benchmark
+        from model_mommy.models import Dog, Person
+
+        report = benchmark.run([Person, Dog], qty=3)
+
+        self.assertEqual(report['qty'], 3)
+        self.assertIn('Person.name', report['generators'])
+        self.assertIn('Dog.owner', report['generators'])
+        self.assertNotIn('Dog.id', report['generators'])
+
+        measures = report['operations']['Dog']
+        self.assertEqual(set(measures), set(name for name, operation
+                                            in benchmark.OPERATIONS))
+        self.assertEqual(measures['prepare_many']['queries_per_row'], 0)
+        self.assertTrue(measures['make_many']['queries_per_row'] >= 2)
+        self.assertTrue(measures['make_many']['rows_per_sec'] > 0)
+
+    def test_memory_is_measured_per_call(self):
+        from model_mommy import benchmark, profiling
+
+        if profiling.resident_memory() is None:
+            return
+
+        big = benchmark.measure(lambda: 'x' * (64 << 20), 1)
+        small = benchmark.measure(lambda: 'x', 1)
+
+        self.assertTrue(big['memory_kb'] >= 60000)
+        self.assertTrue(small['memory_kb'] < 1000)
+
+    def test_model_zoo_skips_unsupported_models(self):
+        from model_mommy import benchmark
+        from model_mommy.models import Penguin, Store, UnsupportedModel
+
+        zoo = benchmark.model_zoo()
+
+        self.assertIn(Store, zoo)
+        self.assertIn(Penguin, zoo)
+        self.assertNotIn(UnsupportedModel, zoo)
+
+
+class TestBenchmarkHistory(TestCase):
+    def entry(self, commit, samples=None):
+        from model_mommy.benchmark import summarize
+
+        return {
+            'commit': commit,
+            'environment': {'python': '2.7'},
+            'qty': 10,
+            'results': dict((name, summarize(rates))
+                            for name, rates in (samples or {}).items()),
+        }
+
+    def test_summarize(self):
+        from model_mommy.benchmark import summarize
+
+        summary = summarize([5, 1, 4, 2, 3])
+
+        self.assertEqual(summary['median'], 3)
+        self.assertEqual((summary['q1'], summary['q3']), (2, 4))
+        self.assertEqual(summary['iqr'], 2)
+
+    def test_regressions_of_gated_benchmarks(self):
+        from model_mommy.benchmark import compare
+
+        baseline = self.entry('a', {'generators/x': [100, 101, 99],
+                                    'operations/Dog.make_many': [50, 51, 49],
+                                    'operations/Dog.make_attrs': [50, 51, 49]})
+        current = self.entry('b', {'generators/x': [80, 81, 79],
+                                   'operations/Dog.make_many': [50, 52, 48],
+                                   'operations/Dog.make_attrs': [10, 11, 9]})
+
+        deltas, regressions = compare(baseline, current, threshold=0.1)
+
+        self.assertAlmostEqual(deltas['generators/x'], -0.2)
+        self.assertEqual(deltas['operations/Dog.make_many'], 0)
+        # make_attrs got slower, but only generators and make_many are gated
+        self.assertEqual(regressions, ['generators/x'])
+
+    def test_noisy_slowdowns_are_not_regressions(self):
+        from model_mommy.benchmark import compare
+
+        baseline = self.entry('a', {'generators/x': [100, 60, 140]})
+        current = self.entry('b', {'generators/x': [80, 50, 120]})
+
+        deltas, regressions = compare(baseline, current, threshold=0.1)
+
+        self.assertAlmostEqual(deltas['generators/x'], -0.2)
+        self.assertEqual(regressions, [])
+
+    def test_too_few_samples_are_not_regressions(self):
+        from model_mommy.benchmark import compare
+
+        baseline = self.entry('a', {'generators/x': [100, 101]})
+        current = self.entry('b', {'generators/x': [50, 51]})
+
+        deltas, regressions = compare(baseline, current, threshold=0.1)
+
+        self.assertTrue(deltas['generators/x'] < -0.4)
+        self.assertEqual(regressions, [])
+
+    def test_baseline_is_the_latest_entry_of_the_environment(self):
+        from model_mommy.benchmark import find_baseline
+
+        history = [self.entry('a'), self.entry('b'), self.entry('c')]
+        history[2]['environment'] = {'python': '2.6'}
+
+        self.assertEqual(find_baseline(history, self.entry('d'))['commit'], 'b')
+        self.assertEqual(find_baseline(history, self.entry('d'), 'a')['commit'], 'a')
+        self.assertEqual(find_baseline(history, self.entry('d'), 'c'), None)
@@ -0,0 +1,657 @@
+# -*- coding:utf-8 -*-
+
+from datetime import date, datetime
+
+from django.test import TestCase, TransactionTestCase
+
+from model_mommy.mommy import Mommy
+
+
+class ParallelTestMommy(Mommy):  # make_many workers need to import it
+    def value_for_agefield(self, field):
+        return 3
+
+
+class TestBulkMakeMany(TestCase):
+    def test_bulk_make_many_people(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        people = mommy.make_many(Person, 10, bulk=True)
+
+        self.assertEqual(len(people), 10)
+        self.assertEqual(Person.objects.count(), 10)
+
+        # primary keys were set on the returned instances
+        pks = set(Person.objects.values_list('pk', flat=True))
+        self.assertEqual(set(person.pk for person in people), pks)
+
+    def test_bulk_make_many_in_batches(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        people = mommy.make_many(Person, 7, bulk=True, batch_size=3, name='Mike')
+
+        self.assertEqual(Person.objects.filter(name='Mike').count(), 7)
+        self.assertEqual(len(set(person.pk for person in people)), 7)
+
+    def test_bulk_make_many_inherited_model(self):
+        from model_mommy import mommy
+        from model_mommy.models import Cat, Pet
+
+        for options in ({'bulk': True}, {'workers': 2}, {'pipeline': True}):
+            cats = mommy.make_many(Cat, 3, **options)
+            self.assertEqual(len(set(cat.pk for cat in cats)), 3)
+
+        self.assertEqual(Cat.objects.count(), 9)
+        self.assertEqual(Pet.objects.count(), 9)
+
+    def test_bulk_make_many_with_foreign_key(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        dogs = mommy.make_many(Dog, 4, bulk=True)
+
+        self.assertEqual(Dog.objects.count(), 4)
+        self.assertEqual(Person.objects.count(), 4)
+        for dog in dogs:
+            self.assertEqual(Dog.objects.get(pk=dog.pk).owner_id, dog.owner.pk)
+
+    def test_bulk_make_many_with_m2m_values(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person, Store
+
+        employees = mommy.make_many(Person, 3)
+        stores = mommy.make_many(Store, 2, bulk=True, employees=employees)
+
+        for store in stores:
+            self.assertEqual(store.employees.count(), 3)
+
+    def test_bulk_insert_with_some_pks_given(self):
+        from model_mommy import mommy
+        from model_mommy.bulk import bulk_insert
+        from model_mommy.models import Person
+
+        people = [mommy.prepare_one(Person, id=100), mommy.prepare_one(Person)]
+        bulk_insert(Person, people)
+
+        self.assertEqual(people[0].pk, 100)
+        self.assertEqual(Person.objects.get(pk=people[1].pk).name,
+                         people[1].name)
+
+    def test_concurrent_bulk_inserts_fail_loudly(self):
+        from django.db import DatabaseError
+        from django.db.models.query import QuerySet
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        bulk_create = QuerySet.bulk_create
+
+        def racing_bulk_create(queryset, objs, *args, **kwargs):
+            mommy.make_one(Person)  # another connection inserting meanwhile
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        QuerySet.bulk_create = racing_bulk_create
+        try:
+            self.assertRaises(DatabaseError, mommy.make_many, Person, 3,
+                              bulk=True)
+        finally:
+            QuerySet.bulk_create = bulk_create
+
+
+class TestPersistingObjectGraphs(TestCase):
+    def test_make_one_saves_grandparents(self):
+        from model_mommy import mommy
+        from model_mommy.models import Kennel, Dog, Person
+
+        kennel = mommy.make_one(Kennel)
+
+        self.assertEqual(Kennel.objects.count(), 1)
+        self.assertEqual(Dog.objects.get(pk=kennel.dog_id).owner_id, kennel.dog.owner.pk)
+        self.assertEqual(Person.objects.count(), 1)
+
+    def test_bulk_make_many_saves_whole_graph(self):
+        from model_mommy import mommy
+        from model_mommy.models import Kennel, Dog, Person
+
+        kennels = mommy.make_many(Kennel, 6, bulk=True, batch_size=4)
+
+        self.assertEqual(Kennel.objects.count(), 6)
+        self.assertEqual(Dog.objects.count(), 6)
+        self.assertEqual(Person.objects.count(), 6)
+
+        for kennel in kennels:
+            saved = Kennel.objects.select_related('dog').get(pk=kennel.pk)
+            self.assertEqual(saved.dog.owner_id, kennel.dog.owner.pk)
+
+    def test_bulk_make_many_query_count_does_not_depend_on_qty(self):
+        from model_mommy import mommy
+        from model_mommy.models import Kennel
+
+        # level by level: read last pk, insert, read new pks
+        self.assertNumQueries(9, lambda: mommy.make_many(Kennel, 2, bulk=True))
+        self.assertNumQueries(9, lambda: mommy.make_many(Kennel, 50, bulk=True))
+
+    def test_object_graph_levels(self):
+        from model_mommy import mommy
+        from model_mommy.bulk import ObjectGraph
+        from model_mommy.models import Kennel, Dog, Person
+
+        kennels = mommy.prepare_many(Kennel, 3)
+        graph = ObjectGraph(kennels)
+
+        self.assertEqual(
+            [(model, len(batch)) for model, batch in graph],
+            [(Person, 3), (Dog, 3), (Kennel, 3)])
+
+
+class TestBulkManyToManyLinks(TestCase):
+    def test_bulk_links_use_one_insert_per_m2m_field(self):
+        from django.db import connection
+        from model_mommy import mommy
+        from model_mommy.models import Person, Store
+
+        employees = mommy.make_many(Person, 3)
+        customers = mommy.make_many(Person, 20)
+
+        # stores have no column but the pk, so each one takes an insert;
+        # then there's a single insert per m2m field
+        self.assertNumQueries(12, lambda: mommy.make_many(
+            Store, 10, bulk=True, employees=employees, customers=customers))
+
+        for store in Store.objects.all():
+            self.assertEqual(store.employees.count(), 3)
+            self.assertEqual(store.customers.count(), 20)
+
+    def test_bulk_links_for_self_referencing_m2m(self):
+        from model_mommy import mommy
+        from model_mommy.models import Penguin
+
+        fellows = mommy.make_many(Penguin, 3, fill_null=False)
+        penguins = mommy.make_many(Penguin, 2, bulk=True, fill_null=False, parcel=fellows)
+
+        for penguin in penguins:
+            self.assertEqual(penguin.parcel.count(), 3)
+
+        # symmetrical relations are linked both ways
+        for fellow in fellows:
+            self.assertEqual(set(fellow.parcel.all()), set(penguins))
+
+
+class TestParentPools(TestCase):
+    def test_make_many_with_pool_size(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        dogs = mommy.make_many(Dog, 10, fk_pool=3)
+
+        self.assertEqual(Dog.objects.count(), 10)
+        self.assertEqual(Person.objects.count(), 3)
+
+        # round robin: each owner gets every third dog
+        owners = [dog.owner_id for dog in dogs]
+        self.assertEqual(owners, owners[:3] * 3 + owners[:1])
+
+    def test_bulk_make_many_with_pool_per_field(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        mommy.make_many(Dog, 10, bulk=True, fk_pool={'owner': 2})
+
+        self.assertEqual(Person.objects.count(), 2)
+        self.assertEqual(
+            sorted(p.dog_set.count() for p in Person.objects.all()), [5, 5])
+
+    def test_pool_per_model_with_fan_out(self):
+        from model_mommy import mommy
+        from model_mommy.base import ParentPool
+        from model_mommy.models import Dog, Person
+
+        pool = ParentPool(fan_out=4)
+        dogs = mommy.prepare_many(Dog, 10, fk_pool={Person: pool})
+
+        self.assertEqual(len(set(id(dog.owner) for dog in dogs)), 3)
+        self.assertTrue(dogs[0].owner is dogs[3].owner)
+        self.assertFalse(dogs[3].owner is dogs[4].owner)
+
+    def test_pool_per_model_applies_to_parents(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Kennel, Person
+
+        mommy.make_many(Kennel, 20, bulk=True, fk_pool={Person: 3})
+
+        self.assertEqual(Dog.objects.count(), 20)
+        self.assertEqual(Person.objects.count(), 3)
+
+    def test_pool_per_field_name_applies_to_own_fields(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Kennel, Person
+
+        mommy.make_many(Kennel, 6, fk_pool={'dog': 2, 'owner': 1})
+
+        self.assertEqual(Dog.objects.count(), 2)
+        self.assertEqual(Person.objects.count(), 2)
+
+    def test_pools_are_not_shared_between_calls(self):
+        from model_mommy import mommy
+        from model_mommy.base import ParentPool
+        from model_mommy.models import Dog, Person
+
+        pool = ParentPool(size=2)
+        mommy.make_many(Dog, 4, fk_pool={'owner': pool})
+        Person.objects.all().delete()
+        dogs = mommy.make_many(Dog, 2, fk_pool={'owner': pool})
+
+        self.assertEqual(pool.parents, [])
+        self.assertEqual(Person.objects.count(), 2)
+        for dog in dogs:
+            self.assertTrue(Person.objects.filter(pk=dog.owner_id).exists())
+
+    def test_pool_size_and_fan_out_are_exclusive(self):
+        from model_mommy.base import ParentPool
+
+        self.assertRaises(AssertionError, ParentPool, size=2, fan_out=3)
+        self.assertRaises(AssertionError, ParentPool)
+
+    def test_random_pool_strategy(self):
+        from model_mommy.base import ParentPool
+
+        pool = ParentPool(size=2, strategy='random')
+        parents = [pool.get(object) for i in range(20)]
+
+        self.assertEqual(len(set(parents)), 2)
+
+
+class TestStreamingGeneration(TestCase):
+    def test_iter_make_commits_chunk_by_chunk(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        dogs = mommy.iter_make(Dog, 10, chunk_size=4)
+        self.assertEqual(Dog.objects.count(), 0)  # nothing happens until asked
+
+        first = next(dogs)
+        self.assertEqual(Dog.objects.count(), 4)
+        self.assertEqual(Dog.objects.get(pk=first.pk).owner_id, first.owner.pk)
+
+        self.assertEqual(len(list(dogs)), 9)
+        self.assertEqual(Dog.objects.count(), 10)
+        self.assertEqual(Person.objects.count(), 10)
+
+    def test_iter_prepare_does_not_persist(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        people = list(mommy.iter_prepare(Person, 7, chunk_size=3, name='Mike'))
+
+        self.assertEqual(len(people), 7)
+        self.assertTrue(all(person.name == 'Mike' for person in people))
+        self.assertEqual(Person.objects.count(), 0)
+
+    def test_iter_make_inherited_model(self):
+        from model_mommy import mommy
+        from model_mommy.models import Cat, Pet
+
+        cats = list(mommy.iter_make(Cat, 2))
+
+        self.assertEqual(Cat.objects.count(), 2)
+        self.assertEqual(Pet.objects.count(), 2)
+        for cat in cats:
+            self.assertEqual(Cat.objects.get(pk=cat.pk).lives, cat.lives)
+
+
+class TestParallelPreparation(TestCase):
+    def test_make_many_with_workers(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        dogs = mommy.make_many(Dog, 25, workers=2)
+
+        self.assertEqual(len(dogs), 25)
+        self.assertEqual(Dog.objects.count(), 25)
+        self.assertEqual(Person.objects.count(), 25)
+        for dog in dogs:
+            self.assertEqual(Dog.objects.get(pk=dog.pk).owner_id, dog.owner.pk)
+
+    def test_workers_use_mommy_subclass(self):
+        from model_mommy.models import Person
+
+        people = ParallelTestMommy(Person).make_many(6, workers=3)
+        self.assertEqual(set(person.age for person in people), set([3]))
+
+    def test_seeded_workers_are_reproducible(self):
+        from model_mommy.models import Person
+
+        first = Mommy(Person, seed=5).make_many(8, workers=2)
+        second = Mommy(Person, seed=5).make_many(8, workers=2)
+        self.assertEqual([p.name for p in first], [p.name for p in second])
+
+        # whatever the number of workers
+        first = Mommy(Person, seed=5).make_many(250, workers=2)
+        second = Mommy(Person, seed=5).make_many(250, workers=3)
+        self.assertEqual([p.name for p in first], [p.name for p in second])
+
+        # unseeded workers don't repeat each other
+        people = Mommy(Person).make_many(20, workers=2)
+        self.assertEqual(len(set(p.email for p in people)), 20)
+
+    def test_unsaved_parent_is_inserted_once(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        owner = mommy.prepare_one(Person)
+        dogs = mommy.make_many(Dog, 250, workers=2, owner=owner)
+
+        self.assertEqual(Person.objects.count(), 1)
+        self.assertEqual(set(dog.owner_id for dog in dogs), set([owner.pk]))
+
+    def test_workers_use_mommy_overrides(self):
+        from model_mommy.models import Person
+
+        mom = Mommy(Person)
+        mom.choice_weights = {Person: {'gender': {'M': 0}}}
+        people = mom.make_many(6, workers=2)
+        self.assertEqual(set(person.gender for person in people), set(['F']))
+
+        mom.value_for_agefield = lambda field: 7
+        self.assertRaises(AssertionError, mom.make_many, 6, workers=2)
+
+
+class TestPipelinedGeneration(TestCase):
+    def test_make_many_pipelined(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        dogs = mommy.make_many(Dog, 30, pipeline=True, queue_depth=1, fk_pool=4)
+
+        self.assertEqual(len(dogs), 30)
+        self.assertEqual(Dog.objects.count(), 30)
+        self.assertEqual(Person.objects.count(), 4)
+
+    def test_pipelined_keeps_order_and_raises_producer_errors(self):
+        from model_mommy.bulk import pipelined
+
+        self.assertEqual(list(pipelined(iter(range(10)), 2)), range(10))
+        self.assertRaises(AssertionError, list, pipelined(iter(range(10)), 0))
+
+        def broken():
+            yield 1
+            raise ValueError('generation failed')
+
+        items = pipelined(broken())
+        self.assertEqual(next(items), 1)
+        self.assertRaises(ValueError, lambda: next(items))
+
+    def test_pipelined_stops_producer_when_abandoned(self):
+        from itertools import count
+        from model_mommy.bulk import pipelined
+
+        items = pipelined(count(), 1)
+        self.assertEqual(next(items), 0)
+        items.close()  # would hang if the producer kept waiting
+
+
+class TestAtomicMakeMany(TransactionTestCase):
+    def test_atomic_make_many_rolls_everything_back_on_errors(self):
+        from django.db import IntegrityError
+        from model_mommy import mommy
+        from model_mommy.models import DummyOneToOneModel, DummyRelationModel
+
+        relation = mommy.make_one(DummyRelationModel)
+
+        # the second instance breaks the one to one uniqueness
+        self.assertRaises(IntegrityError, lambda: mommy.make_many(
+            DummyOneToOneModel, 3, atomic=True, one_to_one_field=relation))
+        self.assertEqual(DummyOneToOneModel.objects.count(), 0)
+
+    def test_savepoints_keep_what_was_saved_before_errors(self):
+        from django.db import IntegrityError
+        from model_mommy import mommy
+        from model_mommy.models import DummyOneToOneModel, DummyRelationModel
+
+        relation = mommy.make_one(DummyRelationModel)
+
+        self.assertRaises(IntegrityError, lambda: mommy.make_many(
+            DummyOneToOneModel, 3, savepoint_every=1, one_to_one_field=relation))
+        self.assertEqual(DummyOneToOneModel.objects.count(), 1)
+
+    def test_savepoints_roll_back_the_whole_failing_part(self):
+        from django.db import IntegrityError
+        from model_mommy import mommy
+        from model_mommy.models import DummyOneToOneModel, DummyRelationModel
+
+        relation = mommy.make_one(DummyRelationModel)
+
+        self.assertRaises(IntegrityError, lambda: mommy.make_many(
+            DummyOneToOneModel, 3, savepoint_every=2, one_to_one_field=relation))
+        self.assertEqual(DummyOneToOneModel.objects.count(), 0)
+
+    def test_savepoints_in_a_transaction_need_database_support(self):
+        from django.db import connection, transaction
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        if connection.features.uses_savepoints:
+            return
+
+        with transaction.commit_on_success():
+            self.assertRaises(transaction.TransactionManagementError,
+                              mommy.make_many, Person, 3, savepoint_every=2)
+
+    def test_atomic_bulk_make_many(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        dogs = mommy.make_many(Dog, 12, bulk=True, atomic=True, savepoint_every=5)
+
+        self.assertEqual(Dog.objects.count(), 12)
+        self.assertEqual(len(set(dog.pk for dog in dogs)), 12)
+
+
+class TestSignalFreePersistence(TestCase):
+    def setUp(self):
+        from django.db.models.signals import post_save, m2m_changed
+
+        self.sent = []
+        self.receiver = lambda sender, **kwargs: self.sent.append(sender)
+        post_save.connect(self.receiver)
+        m2m_changed.connect(self.receiver)
+
+    def tearDown(self):
+        from django.db.models.signals import post_save, m2m_changed
+
+        post_save.disconnect(self.receiver)
+        m2m_changed.disconnect(self.receiver)
+
+    def test_make_many_sends_no_signals(self):
+        from model_mommy import mommy
+        from model_mommy.models import Kennel, Dog, Person
+
+        kennels = mommy.make_many(Kennel, 4, signals=False)
+
+        self.assertEqual(self.sent, [])
+        self.assertEqual(Kennel.objects.count(), 4)
+        self.assertEqual(Dog.objects.count(), 4)
+        self.assertEqual(Person.objects.count(), 4)
+        self.assertTrue(all(kennel.pk for kennel in kennels))
+
+    def test_make_one_sends_no_signals(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person, Store
+
+        employees = mommy.make_many(Person, 3)
+        self.sent = []
+        store = mommy.make_one(Store, signals=False, employees=employees)
+
+        self.assertEqual(self.sent, [])
+        self.assertTrue(store.pk)
+        self.assertEqual(store.employees.count(), 3)
+
+    def test_inherited_models_send_no_signals(self):
+        from model_mommy import mommy
+        from model_mommy.models import Cat, Pet
+
+        cat = mommy.make_one(Cat, signals=False)
+        cats = mommy.make_many(Cat, 3, signals=False)
+
+        self.assertEqual(self.sent, [])
+        self.assertEqual(Cat.objects.count(), 4)
+        self.assertEqual(Pet.objects.count(), 4)
+
+        for made in [cat] + cats:
+            saved = Cat.objects.get(pk=made.pk)
+            self.assertEqual((saved.name, saved.lives), (made.name, made.lives))
+
+    def test_signals_are_sent_by_default(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        mommy.make_one(Dog)
+        self.assertTrue(Dog in self.sent)
+
+    def test_on_batch_is_called_once_per_model_batch(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        batches = []
+        dogs = mommy.make_many(Dog, 6, signals=False,
+            on_batch=lambda model, instances: batches.append((model, len(instances))))
+
+        self.assertEqual(self.sent, [])
+        self.assertEqual(batches, [(Person, 6), (Dog, 6)])
+        self.assertEqual(len(dogs), 6)
+
+
+class TestRawLoading(TestCase):
+    def test_load_many_inserts_rows_and_returns_pk_ranges(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        pks = mommy.load_many(Dog, 25, batch_size=10)
+
+        self.assertEqual([len(batch) for batch in pks], [10, 10, 5])
+        self.assertEqual(sorted(pk for batch in pks for pk in batch),
+                         sorted(Dog.objects.values_list('pk', flat=True)))
+        self.assertEqual(Person.objects.count(), 25)
+
+        for dog in Dog.objects.select_related('owner'):
+            self.assertTrue(dog.breed)
+            self.assertTrue(dog.owner.name)
+
+    def test_load_many_converts_values_for_the_database(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        pks = mommy.load_many(Person, 5, fill_null=True)
+        people = Person.objects.filter(pk__in=list(pks[0]))
+
+        self.assertEqual(people.count(), 5)
+        for person in people:
+            self.assertTrue(isinstance(person.birthday, date))
+            self.assertTrue(isinstance(person.appointment, datetime))
+            self.assertTrue(person.bio)
+
+    def test_load_many_uses_given_values_and_parents(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        owner = mommy.make_one(Person)
+        mommy.load_many(Dog, 4, owner=owner, breed='pug')
+
+        self.assertEqual(Person.objects.count(), 1)
+        self.assertEqual(owner.dog_set.filter(breed='pug').count(), 4)
+
+    def test_load_many_tables_with_only_a_pk(self):
+        from model_mommy import mommy
+        from model_mommy.models import Store
+
+        pks = mommy.load_many(Store, 3)
+
+        self.assertEqual(Store.objects.count(), 3)
+        self.assertEqual(len(pks[0]), 3)
+
+    def test_load_many_sets_auto_now_fields(self):
+        from model_mommy import mommy
+        from model_mommy.models import DummyAutoNowModel
+
+        before = datetime.now().replace(microsecond=0)
+        mommy.load_many(DummyAutoNowModel, 3)
+
+        for row in DummyAutoNowModel.objects.all():
+            self.assertTrue(row.created >= before)
+            self.assertEqual(row.updated, date.today())
+
+    def test_load_many_fails_on_concurrent_inserts(self):
+        from django.db import DatabaseError, connection
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        class RacingCursor(object):
+            def __init__(self, cursor):
+                self.cursor = cursor
+
+            def executemany(self, sql, params):
+                mommy.make_one(Person)  # another connection inserting meanwhile
+                return self.cursor.executemany(sql, params)
+
+            def __getattr__(self, name):
+                return getattr(self.cursor, name)
+
+        cursor = connection.cursor
+        connection.cursor = lambda: RacingCursor(cursor())
+        try:
+            self.assertRaises(DatabaseError, mommy.load_many, Person, 3)
+        finally:
+            connection.cursor = cursor
+
+
+class TestMakeManyReturningModes(TestCase):
+    def test_returning_pks_of_bulk_inserts(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        pks = mommy.make_many(Dog, 12, bulk=True, returning='pk')
+
+        self.assertTrue(isinstance(pks, xrange))
+        self.assertEqual(list(pks), list(Dog.objects.order_by('pk')
+                                         .values_list('pk', flat=True)))
+
+    def test_compact_pks(self):
+        from array import array
+        from model_mommy.bulk import PK_TYPECODE, compact_pks
+
+        pks = compact_pks(array(PK_TYPECODE, [4, 5, 6]))
+        self.assertTrue(isinstance(pks, xrange))
+        self.assertEqual(list(pks), [4, 5, 6])
+
+        gaps = array(PK_TYPECODE, [4, 6, 7])
+        self.assertTrue(compact_pks(gaps) is gaps)
+
+        names = ['a', 'b']
+        self.assertTrue(compact_pks(names) is names)
+
+    def test_returning_count(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        self.assertEqual(mommy.make_many(Dog, 7, returning=None), 7)
+        self.assertEqual(Dog.objects.count(), 7)
+
+    def test_returning_pks_in_chunks(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        from model_mommy.constants import CHUNK_SIZE
+
+        qty = CHUNK_SIZE + 10
+        pks = mommy.make_many(Person, qty, bulk=True, returning='pk')
+
+        self.assertEqual(len(pks), qty)
+        self.assertEqual(Person.objects.filter(pk__in=list(pks)).count(), qty)
+
+    def test_unknown_returning_mode(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        self.assertRaises(AssertionError, mommy.make_many, Dog, 1,
+                          returning='rows')
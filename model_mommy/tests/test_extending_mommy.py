@@ -1,5 +1,6 @@
 # -*- coding:utf-8 -*-
 
+from django.db.models import IntegerField
 from django.test import TestCase
 
 
@@ -30,3 +31,94 @@ class SimpleExtendMommy(TestCase):
 
         # making a young person
         self.assertLessEqual(person.age, max_age)
+
+
+class ExtendingBatchGeneration(TestCase):
+    def test_scalar_overrides_are_used_by_prepare_many(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import DummyIntModel
+
+        class SmallNumbersMommy(Mommy):
+            def value_for_integerfield(self, field):
+                return 7
+
+        models = SmallNumbersMommy(DummyIntModel).prepare_many(20)
+        self.assertEqual(set(m.int_field for m in models), set([7]))
+
+    def test_batch_overrides_are_used_by_make_many(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import Person
+
+        class YoungPeopleMommy(Mommy):
+            def value_for_agefield(self, field):
+                return 1
+
+            def values_for_agefield(self, field, n):
+                return [2] * n
+
+        mom = YoungPeopleMommy(Person)
+        self.assertEqual(mom.make().age, 1)
+        self.assertEqual(set(p.age for p in mom.make_many(10)), set([2]))
+
+    def test_choice_weights(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import Car, Person
+
+        class RedCarsMommy(Mommy):
+            choice_weights = {Car: {'color': {0: 0, 1: 0}},
+                              Person: {'gender': {'M': 0}}}
+
+        cars = RedCarsMommy(Car).prepare_many(20)
+        self.assertEqual(set(car.color for car in cars), set([2]))
+        self.assertEqual(RedCarsMommy(Car).prepare().color, 2)
+        self.assertEqual(RedCarsMommy(Person).prepare().gender, 'F')
+
+    def test_choice_weights_apply_to_their_model_only(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import Dog, Person
+
+        class MenMommy(Mommy):
+            # the Dog weights don't fit Person's gender choices
+            choice_weights = {Person: {'gender': {'F': 0}},
+                              Dog: {'gender': {'X': 1}}}
+
+        # owners are weighted by the Person weights only
+        dogs = MenMommy(Dog).prepare_many(10)
+        self.assertEqual(set(dog.owner.gender for dog in dogs), set(['M']))
+
+
+class ChangingGenerators(TestCase):
+    def test_generators_set_on_the_class_later(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import DummyIntModel
+
+        class LateMommy(Mommy):
+            pass
+
+        class LaterMommy(LateMommy):
+            pass
+
+        mom = LaterMommy(DummyIntModel)
+        mom.prepare()  # compiles the plan
+
+        LateMommy.value_for_integerfield = lambda self, field: 7
+        self.assertEqual(mom.prepare().int_field, 7)
+        self.assertEqual(
+            set(m.int_field for m in LaterMommy(DummyIntModel).prepare_many(5)),
+            set([7]))
+
+        del LateMommy.value_for_integerfield
+        self.assertEqual(LateMommy.generator_for(IntegerField),
+                         Mommy.generator_for(IntegerField))
+
+    def test_generators_set_on_a_mommy(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import DummyIntModel
+
+        mom = Mommy(DummyIntModel)
+        mom.prepare()
+
+        mom.value_for_integerfield = lambda field: 7
+        self.assertEqual(set(m.int_field for m in mom.prepare_many(5)),
+                         set([7]))
+        self.assertFalse(Mommy(DummyIntModel).get_plan() is mom.get_plan())
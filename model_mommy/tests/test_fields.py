@@ -18,6 +18,37 @@ class HandlingModelsWithUnsupportedFields(TestCase):
         self.assertRaises(TypeError, lambda: mommy.make_one(UnsupportedModel))
 
 
+class HandlingSubclassesOfSupportedFields(TestCase):
+    def test_field_subclasses_use_the_generator_of_their_base_class(self):
+        from model_mommy import mommy
+        from model_mommy.models import DummyCustomFieldModel
+
+        dummy = mommy.make_one(DummyCustomFieldModel)
+
+        self.assertTrue(isinstance(dummy.country, basestring))
+        self.assertTrue(0 < len(dummy.country) <= 2)
+
+    def test_field_subclasses_in_mommy_subclasses(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import CountryCodeField, DummyCustomFieldModel
+
+        class CountryMommy(Mommy):
+            def value_for_countrycodefield(self, field):
+                return 'BR'
+
+            def value_for_friendliest_countryfield(self, field):
+                return 'PT'
+
+        dummy = CountryMommy(DummyCustomFieldModel).make()
+
+        self.assertEqual(dummy.country, 'BR')
+        self.assertEqual(dummy.friendliest_country, 'PT')
+        self.assertEqual(Mommy.generator_for(CountryCodeField),
+                         Mommy.value_for_charfield)
+        self.assertEqual(CountryMommy.generator_for(CountryCodeField),
+                         CountryMommy.value_for_countrycodefield)
+
+
 class TestFillingSlugField(TestCase):
     def is_slug(self, slug):
         import string
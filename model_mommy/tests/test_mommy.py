@@ -241,6 +241,70 @@ class TestMommyAPI(TestCase):
                 self.assertIsNotNone(attrs[field.name])
 
 
+    def test_make_attrs_many_rows(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        rows = mommy.make_attrs_many(Person, 20, name='John', fill_null=True)
+
+        self.assertEqual(len(rows), 20)
+        for attrs in rows:
+            self.assertEqual(attrs['name'], 'John')
+            self.assertIsNotNone(attrs['bio'])
+
+    def test_make_attrs_many_columns(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        columns = mommy.make_attrs_many(Person, 20, layout='columns', age=3)
+
+        self.assertNotIn('id', columns)
+        self.assertEqual(columns['age'], [3] * 20)
+        for name, values in columns.items():
+            self.assertEqual(len(values), 20)
+
+        # nullable fields left null get None
+        self.assertTrue(all(isinstance(value, (unicode, type(None)))
+                            for value in columns['bio']))
+
+    def test_make_attrs_many_layouts_give_the_same_data(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        rows = mommy.make_attrs_many(Person, 10, seed=3)
+        columns = mommy.make_attrs_many(Person, 10, seed=3, layout='columns')
+
+        # dates are relative to now, the rest only depends on the seed
+        for name in ('birthday', 'appointment'):
+            del columns[name]
+
+        for index, attrs in enumerate(rows):
+            for name, values in columns.items():
+                self.assertEqual(attrs.get(name), values[index])
+
+    def test_dump_attrs_many_as_json_lines(self):
+        import json
+        from StringIO import StringIO
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        stream = StringIO()
+        lines = mommy.dump_attrs_many(Person, stream, 25, chunk_size=10)
+        rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(lines, 25)
+        self.assertEqual(len(rows), 25)
+        self.assertTrue(all(row['name'] for row in rows))
+
+        stream = StringIO()
+        lines = mommy.dump_attrs_many(Person, stream, 25, chunk_size=10,
+                                      layout='columns')
+        chunks = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(lines, 3)
+        self.assertEqual([len(chunk['name']) for chunk in chunks], [10, 10, 5])
+
+
 class TestMommyClassAPI(TestCase):
     def test_get_all_fields_method(self):
         from model_mommy.base import Mommy
@@ -250,6 +314,80 @@ class TestMommyClassAPI(TestCase):
         all_fields = mommy.get_fields() + mommy.get_m2m_fields()
         self.assertEqual(len(mommy.get_all_fields()), len(all_fields))
 
+    def test_generation_plan_is_shared_between_instances(self):
+        from model_mommy.base import Mommy
+        from model_mommy.models import Person
+
+        class Aunt(Mommy):
+            pass
+
+        plan = Mommy(Person).get_plan()
+        self.assertTrue(Mommy(Person).get_plan() is plan)
+        self.assertFalse(Mommy(Person, fill_null=True).get_plan() is plan)
+        self.assertFalse(Aunt(Person).get_plan() is plan)
+
+    def test_generation_plan_skips_auto_and_nullable_related_fields(self):
+        from model_mommy.base import Mommy
+        from model_mommy.models import DummySelfReferenceModel
+
+        plan = Mommy(DummySelfReferenceModel).get_plan()
+        for name, field, generator, null_chance, blank_value, batch in plan.steps(False):
+            self.assertTrue(generator is None)
+
+
+
+class TestColumnarGeneration(TestCase):
+    def test_prepare_many_fills_every_row(self):
+        from model_mommy import mommy
+        from model_mommy.models import DummyIntModel, DummyDecimalModel
+
+        for model in mommy.prepare_many(DummyIntModel, 50):
+            self.assertTrue(-2147483648 <= model.int_field <= 2147483647)
+            self.assertTrue(-32768 <= model.small_int_field <= 32767)
+
+        for model in mommy.prepare_many(DummyDecimalModel, 50):
+            self.assertEqual(len(model.decimal_field), 6)
+
+    def test_make_many_keeps_nullable_fields_random(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        people = mommy.make_many(Person, 10, fill_null=False)
+        self.assertEqual(set(p.bio for p in people), set([None]))
+
+        people = mommy.make_many(Person, 10, fill_null=True)
+        self.assertFalse(None in set(p.bio for p in people))
+
+
+class TestSeededGeneration(TestCase):
+    def values(self, instances, *names):
+        return [tuple(getattr(i, name) for name in names) for i in instances]
+
+    def test_same_seed_gives_same_data(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person, Dog
+
+        names = ('gender', 'name', 'age', 'bio', 'blog', 'email')
+        first = mommy.prepare_many(Person, 10, seed=42)
+        second = mommy.prepare_many(Person, 10, seed=42)
+        self.assertEqual(self.values(first, *names), self.values(second, *names))
+
+        first = mommy.prepare_one(Dog, seed=7)
+        second = mommy.prepare_one(Dog, seed=7)
+        self.assertEqual(self.values([first.owner], *names),
+                         self.values([second.owner], *names))
+
+    def test_substreams_are_reproducible_and_independent(self):
+        from model_mommy.mommy import Mommy
+        from model_mommy.models import DummyIntModel
+
+        mom = Mommy(DummyIntModel, seed=1)
+        first = [mom.substream(i).prepare_many(5) for i in range(2)]
+        second = [mom.substream(i).prepare_many(5) for i in range(2)]
+
+        names = ('int_field', 'big_int_field')
+        self.assertEqual(self.values(first[0], *names), self.values(second[0], *names))
+        self.assertNotEqual(self.values(first[0], *names), self.values(first[1], *names))
 
 
 class TestMommyModelsWithRelations(TestCase):
@@ -294,6 +432,17 @@ class TestMommyModelsWithRelations(TestCase):
         for employee in employees:
             store.employees.get(pk=employee.id)
 
+    def test_many_to_many_values_are_added_at_once(self):
+        from model_mommy.models import Person, Store
+        from model_mommy import mommy
+
+        employees = mommy.make_many(Person, 3)
+        customers = mommy.make_many(Person, 20)
+
+        # the store's insert, then a select and an insert per m2m field
+        self.assertNumQueries(5, lambda: mommy.make_one(
+            Store, employees=employees, customers=customers))
+
 
 class TestAutoRefPattern(TestCase):
     def test_create_one_lone_penguin(self):
@@ -0,0 +1,192 @@
+# -*- coding:utf-8 -*-
+
+from django.test import TestCase
+
+
+class TestProfiling(TestCase):
+    def test_nothing_is_recorded_outside_profile_blocks(self):
+        from model_mommy import mommy, profiling
+        from model_mommy.models import Dog
+
+        with mommy.profile() as stats:
+            pass
+        mommy.make_one(Dog)
+
+        self.assertTrue(profiling.active is None)
+        self.assertEqual(stats.fields, {})
+        self.assertEqual(stats.phases, {})
+
+    def test_make_one_stats(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        with mommy.profile() as stats:
+            mommy.make_one(Dog)
+
+        for model in (Dog, Person):
+            for phase in ('generate', 'construct', 'save'):
+                self.assertEqual(stats.phases[model, phase][0], 1)
+
+        self.assertEqual(stats.fields[Dog, 'owner'][0], 1)
+        self.assertEqual(stats.fields[Person, 'name'][0], 1)
+
+        # the owner field's time includes making the owner
+        self.assertTrue(stats.fields[Dog, 'owner'][1] >=
+                        stats.fields[Person, 'name'][1])
+
+    def test_make_many_stats(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person, Store
+
+        employees = mommy.make_many(Person, 2)
+
+        with mommy.profile() as stats:
+            mommy.make_many(Dog, 4, bulk=True)
+            mommy.make_many(Store, 3, employees=employees)
+
+        self.assertEqual(stats.fields[Dog, 'breed'][0], 4)
+        self.assertEqual(stats.phases[Dog, 'generate'][0], 4)
+        self.assertEqual(stats.phases[Dog, 'save'][0], 4)
+        self.assertEqual(stats.phases[Person, 'save'][0], 4)
+        self.assertEqual(stats.phases[Store, 'm2m'][0], 3)
+
+        report = stats.as_dict()
+        self.assertEqual(report['fields']['Dog.breed']['count'], 4)
+        self.assertEqual(report['phases']['Store:m2m']['count'], 3)
+        self.assertTrue('Dog.breed' in str(stats))
+
+    def test_nested_profiles(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        with mommy.profile() as outer:
+            mommy.prepare_one(Person)
+
+            with mommy.profile() as inner:
+                mommy.prepare_one(Dog)
+
+        self.assertFalse((Dog, 'breed') in outer.fields)
+        self.assertEqual(inner.fields[Dog, 'breed'][0], 1)
+
+    def test_memory_is_not_recorded_by_default(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        with mommy.profile() as stats:
+            mommy.prepare_many(Dog, 2)
+
+        self.assertEqual(stats.field_bytes, {})
+        self.assertTrue(stats.peak_rss_growth_kb is None)
+        self.assertFalse('memory' in stats.as_dict())
+
+    def test_memory_stats(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog, Person
+
+        with mommy.profile(memory=True) as stats:
+            mommy.prepare_many(Dog, 3)
+            mommy.prepare_one(Dog)
+            mommy.make_attrs_many(Person, 3)
+
+        generator, size = stats.field_bytes[Dog, 'breed']
+        self.assertEqual(generator, 'value_for_charfield')
+        self.assertTrue(size > 0)
+        self.assertTrue(stats.field_bytes[Person, 'name'][1] > 0)
+
+        report = stats.as_dict()['memory']
+        self.assertEqual(report['fields']['Dog.breed'],
+                         {'generator': 'value_for_charfield', 'bytes': size})
+        self.assertTrue(report['generators']['value_for_charfield'] > size)
+        self.assertEqual(report['peak_rss_growth_kb'], stats.peak_rss_growth_kb)
+        self.assertTrue('value_for_charfield' in str(stats))
+
+    def test_memory_growth_of_the_block(self):
+        from model_mommy import mommy, profiling
+
+        if profiling.resident_memory() is None:
+            return
+
+        with mommy.profile(memory=True) as stats:
+            held = 'x' * (32 << 20)
+
+        self.assertTrue(stats.rss_growth_kb >= 30000)
+
+        # a block which holds nothing grows little, whatever the peak so far
+        del held
+        with mommy.profile(memory=True) as stats:
+            pass
+        self.assertTrue(stats.rss_growth_kb < 1000)
+        self.assertTrue(stats.peak_rss_growth_kb is None)
+
+    def test_peak_memory_of_the_block(self):
+        from model_mommy import mommy, profiling
+
+        if None in (profiling.resident_memory(), profiling.peak_memory()):
+            return
+
+        # go 64mb above the peak of the process so far, then release it
+        above = profiling.peak_memory() - profiling.resident_memory() + 65536
+
+        with mommy.profile(memory=True) as stats:
+            held = 'x' * (above << 10)
+            del held
+
+        self.assertTrue(stats.rss_growth_kb < 1000)
+        self.assertTrue(stats.peak_rss_growth_kb >= 60000)
+
+
+class TestQueryAccounting(TestCase):
+    def test_make_one_queries(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        with mommy.count_queries() as queries:
+            mommy.make_one(Dog)
+
+        self.assertEqual(queries.count('INSERT', 'Dog'), 1)
+        self.assertEqual(queries.count('INSERT', 'Person'), 1)
+        self.assertEqual(queries.count('INSERT'), 2)
+        self.assertEqual(queries.total, len(queries.statements))
+        self.assertTrue(queries.bytes >= sum(map(len, queries.statements)))
+
+    def test_m2m_statements(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person, Store
+
+        employees = mommy.make_many(Person, 3)
+
+        with mommy.count_queries() as queries:
+            mommy.make_many(Store, 2, employees=employees)
+        with mommy.count_queries() as bulk_queries:
+            mommy.make_many(Store, 2, employees=employees, bulk=True)
+
+        self.assertEqual(queries.count('INSERT', 'Store'), 2)
+        self.assertTrue(queries.count(label='Store.employees') >= 2)
+        self.assertEqual(queries.m2m, queries.count(label='Store.employees'))
+        self.assertEqual(bulk_queries.count('INSERT', 'Store.employees'), 1)
+        self.assertTrue(bulk_queries.m2m < queries.m2m)
+
+    def test_query_budget(self):
+        from model_mommy import mommy
+        from model_mommy.models import Dog
+
+        with mommy.count_queries(max_queries=2):
+            mommy.make_one(Dog)
+
+        def over_budget():
+            with mommy.count_queries(max_queries=3) as queries:
+                mommy.make_many(Dog, 2)
+
+        self.assertRaises(AssertionError, over_budget)
+
+    def test_report_as_dict(self):
+        from model_mommy import mommy
+        from model_mommy.models import Person
+
+        with mommy.count_queries() as queries:
+            mommy.load_many(Person, 5)
+
+        report = queries.as_dict()
+        self.assertEqual(report['counts']['Person']['INSERT'], 1)
+        self.assertEqual(report['m2m'], 0)
+        self.assertTrue('Person' in str(queries))
@@ -80,6 +80,28 @@ class TestUtilsRawString(TestCase):
         value = raw_string(length, LATIN1_RANGE)
         self.assertTrue(all(map(lambda c: LATIN1_RANGE[0] <= ord(c) <= LATIN1_RANGE[-1], value)))
 
+    def test_raw_string_with_tables_not_mapped_from_bytes(self):
+        from model_mommy.utils import raw_string, byte_table
+        from model_mommy.constants import LATIN1_TABLE
+
+        for table in (LATIN1_TABLE + u'\n', u'\u0100\u0101'):
+            self.assertTrue(byte_table(table) is None)
+
+            value = raw_string(30, table)
+            self.assertEqual(len(value), 30)
+            self.assertTrue(all(map(lambda c: c in table, value)))
+
+    def test_raw_strings_output(self):
+        from model_mommy.utils import raw_strings
+        from model_mommy.constants import SLUG_TABLE
+
+        lengths = [0, 1, 5, 100]
+        values = raw_strings(lengths, SLUG_TABLE)
+
+        self.assertEqual(map(len, values), lengths)
+        self.assertTrue(all(type(value) is unicode for value in values))
+        self.assertTrue(all(c in SLUG_TABLE for c in u''.join(values)))
+
     def test_fail_raw_string_with_wrong_table_type(self):
         from model_mommy.utils import raw_string
 
@@ -162,4 +184,160 @@ class TestUtilsRawHostnameMethods(TestCase):
 
         ext_list = ['com.br']
         value = raw_hostname(12, ext_list)
-        self.assertTrue(value.endswith('.com.br'))
\ No newline at end of file
+        self.assertTrue(value.endswith('.com.br'))
+
+class TestUtilsBatchMethods(TestCase):
+    def test_raw_integers_range(self):
+        from model_mommy.utils import raw_integers
+
+        values = raw_integers(8, -10, 200)
+        self.assertEqual(len(values), 200)
+        self.assertTrue(all(-10 <= v < 246 for v in values))
+
+        values = raw_integers(64, -2 ** 63, 200)
+        self.assertTrue(all(-2 ** 63 <= v < 2 ** 63 for v in values))
+
+    def test_raw_digits_length(self):
+        from model_mommy.utils import raw_digits
+
+        values = raw_digits(5, 30)
+        self.assertEqual(len(values), 30)
+        self.assertTrue(all(len(v) == 5 and v.isdigit() for v in values))
+        self.assertEqual(raw_digits(0, 2), ['', ''])
+
+    def test_same_values_without_numpy(self):
+        from random import Random
+        from model_mommy import utils
+
+        def draw():
+            rng = Random(1)
+            return (utils.raw_integers(32, -2 ** 31, 5, rng),
+                    utils.raw_integers(64, -2 ** 63, 5, rng),
+                    utils.raw_digits(7, 5, rng))
+
+        expected = draw()
+        numpy, utils.numpy = utils.numpy, None
+        try:
+            self.assertEqual(draw(), expected)
+        finally:
+            utils.numpy = numpy
+
+
+class TestUtilsChoices(TestCase):
+    def test_flatten_grouped_choices(self):
+        from model_mommy.utils import flatten_choices
+
+        choices = (('a', 'A'),
+                   ('Vowels', (('e', 'E'), ('i', 'I'))),
+                   ('b', 'B'))
+        self.assertEqual(flatten_choices(choices), ('a', 'e', 'i', 'b'))
+
+    def test_raw_choices(self):
+        from model_mommy.utils import raw_choices
+
+        values = raw_choices(('a', 'b', 'c'), 300)
+        self.assertEqual(len(values), 300)
+        self.assertEqual(set(values), set(['a', 'b', 'c']))
+
+    def test_raw_choices_with_weights(self):
+        from model_mommy.utils import cumulative_weights, raw_choices
+
+        values = ('a', 'b', 'c')
+        weights = cumulative_weights(values, {'a': 0, 'c': 3})
+        self.assertEqual(weights, [0, 1, 4])
+
+        picked = raw_choices(values, 1000, weights)
+        self.assertTrue('a' not in picked)
+        self.assertTrue(picked.count('c') > picked.count('b'))
+
+        # weights are keyed by value, not by label
+        self.assertRaises(AssertionError, cumulative_weights, values, {'d': 2})
+
+
+class TestUtilsBatchHostnameAndEmailMethods(TestCase):
+    def test_raw_hostnames_are_valid(self):
+        import re
+        from model_mommy.utils import raw_hostnames
+
+        label = r'[a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?'
+        regex = re.compile(r'^%(l)s(\.%(l)s)*$' % {'l': label})
+
+        lengths = range(1, 255)
+        values = raw_hostnames(lengths)
+
+        self.assertEqual(len(values), len(lengths))
+        for length, value in zip(lengths, values):
+            self.assertLessEqual(len(value), length)
+            self.assertTrue(regex.match(value) is not None, value)
+            self.assertTrue(all(len(l) < 64 for l in value.split('.')))
+
+    def test_raw_hostnames_with_ext_list(self):
+        from model_mommy.utils import raw_hostnames
+
+        values = raw_hostnames([12] * 10, ['.com.br'])
+        self.assertTrue(all(value.endswith('.com.br') for value in values))
+
+    def test_raw_email_localparts_are_valid(self):
+        from model_mommy.utils import raw_email_localparts
+
+        lengths = range(1, 100) * 3
+        values = raw_email_localparts(lengths)
+
+        self.assertEqual(map(len, values), lengths)
+        for value in values:
+            self.assertFalse('..' in value)
+            self.assertNotEqual(value[0], '.')
+            self.assertNotEqual(value[-1], '.')
+
+
+class TestUtilsRawIPv4Methods(TestCase):
+    def test_raw_ipv4s_are_public_addresses(self):
+        from model_mommy.utils import raw_ipv4s
+
+        for value in raw_ipv4s(500):
+            octets = tuple(map(int, value.split('.')))
+
+            self.assertTrue(1 <= octets[0] <= 254)
+            self.assertTrue(1 <= octets[3] <= 254)
+            self.assertFalse(255 in octets)
+            self.assertNotEqual(octets[0], 10)
+            self.assertNotEqual(octets[:2], (192, 168))
+            self.assertFalse((172, 16) <= octets[:2] <= (172, 31))
+
+    def test_raw_ipv4s_packed(self):
+        from model_mommy.utils import raw_ipv4s
+
+        for value in raw_ipv4s(50, packed=True):
+            octets = (value >> 24, (value >> 16) & 255, (value >> 8) & 255, value & 255)
+
+            self.assertTrue(1 <= octets[0] <= 254)
+            self.assertTrue(1 <= octets[3] <= 254)
+            self.assertNotEqual(octets[0], 10)
+
+    def test_whole_index_range_maps_to_addresses(self):
+        from model_mommy.utils import _ipv4_from_index, IPV4_TOTAL
+
+        self.assertEqual(_ipv4_from_index(0), (1, 0, 0, 1))
+        self.assertEqual(_ipv4_from_index(IPV4_TOTAL - 1), (254, 254, 254, 254))
+
+
+class TestUtilsRandomStreams(TestCase):
+    def test_helpers_follow_the_given_rng(self):
+        from random import Random
+        from model_mommy.utils import raw_string, raw_hostnames, raw_ipv4s
+        from model_mommy.constants import LATIN1_TABLE
+
+        def generate(seed):
+            rng = Random(seed)
+            return (raw_string(50, LATIN1_TABLE, rng),
+                    raw_hostnames([30, 40], rng=rng),
+                    raw_ipv4s(3, rng=rng))
+
+        self.assertEqual(generate(3), generate(3))
+        self.assertNotEqual(generate(3), generate(4))
+
+    def test_derive_seed(self):
+        from model_mommy.utils import derive_seed
+
+        self.assertEqual(derive_seed(10, 1), derive_seed(10, 1))
+        self.assertNotEqual(derive_seed(10, 1), derive_seed(10, 2))
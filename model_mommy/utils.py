@@ -5,13 +5,74 @@ Some useful functions if you plan on overwriting mommy methods.
 '''.strip()
 
 import re
-import string
-from random import randint, choice
+import random
+import struct
+from binascii import unhexlify
+from bisect import bisect_right
+from hashlib import sha1
+from itertools import chain
 
-from .constants import ASCII_TABLE
+from .constants import ASCII_TABLE, EMAIL_LOCALPART_TABLE, HOSTNAME_TABLE
 
+LOCALPART_BAD_DOTS = re.compile(r'^\.|\.(?=\.)|\.$')
 
-def raw_string(length, table):
+try:
+    import numpy
+except ImportError:
+    numpy = None  # batch helpers fall back to pure python
+
+
+# all helpers take an optional `rng`, a random.Random instance (or the
+# random module itself) used as source for every random value.
+default_rng = random
+
+
+def derive_seed(seed, index):
+    """
+    Derives the seed of the index-th independent substream of `seed`,
+    e.g. one per worker when generating data in parallel.
+
+    """
+    return int(sha1('%r:%r' % (seed, index)).hexdigest()[:16], 16)
+
+
+def random_bytes(n, rng=None):
+    """
+    Returns a str with `n` random bytes taken from `rng`.
+
+    """
+    if n == 0:
+        return ''
+    return unhexlify('%0*x' % (2 * n, (rng or default_rng).getrandbits(8 * n)))
+
+
+_byte_tables = {}  # table -> (translation, deletechars, limit) or None
+
+
+def byte_table(table):
+    """
+    Returns the (translation, deletechars, limit) tuple used to turn random
+    bytes into characters of `table` with str.translate, or None if table
+    can't be mapped from bytes (more than 256 or non latin-1 characters).
+
+    Bytes >= limit are deleted so every character keeps the same chance.
+
+    """
+    if table not in _byte_tables:
+        compiled = None
+        size = len(table)
+
+        if 0 < size <= 256 and max(map(ord, table)) < 256:
+            limit = 256 - 256 % size
+            translation = ''.join([chr(ord(table[i % size])) for i in range(256)])
+            deletechars = ''.join([chr(i) for i in range(limit, 256)])
+            compiled = (translation, deletechars, limit)
+
+        _byte_tables[table] = compiled
+    return _byte_tables[table]
+
+
+def raw_string(length, table, rng=None):
     """
     Creates a random string with length equal to `length` using
     only characters from `table`
@@ -21,15 +82,49 @@ def raw_string(length, table):
     table -- string with usable characters or tuple with usable char code range
 
     """
+    random = (rng or default_rng).random
+
     if isinstance(table, basestring):
-        return u''.join([choice(table) for i in range(length)])
+        compiled = byte_table(table)
+
+        if compiled is None:
+            size = len(table)
+            return u''.join([table[int(random() * size)] for i in xrange(length)])
+
+        translation, deletechars, limit = compiled
+        chars = ''
+
+        while len(chars) < length:
+            missing = length - len(chars)
+            chars += random_bytes(missing * 256 // limit + 8, rng)\
+                .translate(translation, deletechars)
+        return chars[:length].decode('latin-1')
+
     elif isinstance(table, tuple):
-        return u''.join([unichr(randint(*table)) for i in range(length)])
+        start, span = table[0], table[1] - table[0] + 1
+        return u''.join([unichr(start + int(random() * span)) for i in xrange(length)])
+
     else:
         raise TypeError("Unsupported table type provided.")
 
 
-def raw_filename(length, ext_list=None):
+def raw_strings(lengths, table, rng=None):
+    """
+    Creates one random string per length in `lengths`, all of them taken
+    from a single random buffer. See raw_string.
+
+    """
+    text = raw_string(sum(lengths), table, rng)
+    strings = []
+    start = 0
+
+    for length in lengths:
+        strings.append(text[start:start + length])
+        start += length
+    return strings
+
+
+def raw_filename(length, ext_list=None, rng=None):
     """
     Creates a random filename with length up to `max_length`
     and one of the given extensions. Make sure the biggest extension
@@ -45,34 +140,38 @@ def raw_filename(length, ext_list=None):
     char_table = re.sub(r'[/\?%*:|"<>]', '', ASCII_TABLE)
 
     if ext_list is not None:
-        ext = choice(ext_list)
+        ext = (rng or default_rng).choice(ext_list)
     else:
         ext = ''
 
-    name = raw_string(length - len(ext), char_table)
+    name = raw_string(length - len(ext), char_table, rng)
     return name + ext
 
 
-def raw_email_localpart(length):
+def raw_email_localpart(length, rng=None):
     """
     Creates the localpart for an e-mail.
 
     ref: http://en.wikipedia.org/wiki/Email_address
 
     """
-    char_table = string.ascii_letters + string.digits + "!#$%&'*+-/=?^_`{|}~"
-    char_table_ = char_table + "."
+    return raw_email_localparts([length], rng)[0]
 
-    email = ""
-    while len(email) < length:
-        if len(email) in (0, length - 1) or email[-1] == '.':
-            email += choice(char_table)
-        else:
-            email += choice(char_table_)
-    return email
+
+def raw_email_localparts(lengths, rng=None):
+    """
+    Creates one e-mail localpart per length in `lengths`.
+    Localparts don't start or end with a dot, nor have two dots in a row.
+
+    """
+    choice = (rng or default_rng).choice
+    fix = lambda match: choice(EMAIL_LOCALPART_TABLE)
+
+    return [LOCALPART_BAD_DOTS.sub(fix, localpart)
+            for localpart in raw_strings(lengths, EMAIL_LOCALPART_TABLE + '.', rng)]
 
 
-def raw_hostname_label(length):
+def raw_hostname_label(length, rng=None):
     """
     Creates a hostname label.
 
@@ -83,21 +182,29 @@ def raw_hostname_label(length):
     assert length > 0, 'provided length for hostname is too small. min is 1'
     assert length < 64, 'provided length for hostname is too big. max is 63'
 
-    char_table = string.ascii_letters + string.digits
-    char_table_ = string.ascii_letters + string.digits + '-'
-    hostname = ''
+    return raw_hostname_labels([length], rng)[0]
 
-    while len(hostname) < length:
-        # hostname can't start nor end in dot
-        if len(hostname) == 0 or len(hostname) == length - 1:
-            hostname += choice(char_table)
-        else:
-            hostname += choice(char_table_)
 
-    return hostname
+def raw_hostname_labels(lengths, rng=None):
+    """
+    Creates one hostname label per length in `lengths`.
+    Labels don't start or end with an hyphen.
+
+    """
+    choice = (rng or default_rng).choice
+    labels = raw_strings(lengths, HOSTNAME_TABLE + '-', rng)
+
+    for i, label in enumerate(labels):
+        if label[0] == '-':
+            label = choice(HOSTNAME_TABLE) + label[1:]
+
+        if label[-1] == '-':
+            label = label[:-1] + choice(HOSTNAME_TABLE)
+        labels[i] = label
+    return labels
 
 
-def raw_hostname(apr_length, ext_list=None):
+def raw_hostname(apr_length, ext_list=None, rng=None):
     """
     Creates a random valid hostname.
     (a domain name is a hostname with an associated ip address)
@@ -110,26 +217,241 @@ def raw_hostname(apr_length, ext_list=None):
     ref: http://en.wikipedia.org/wiki/Domain_Name
 
     """
-    assert apr_length > 0, 'length is too short'
-    assert apr_length < 256, 'length is too big'
+    return raw_hostnames([apr_length], ext_list, rng)[0]
+
+
+def raw_hostnames(apr_lengths, ext_list=None, rng=None):
+    """
+    Creates one hostname per approximate length in `apr_lengths`.
+    The labels of all hostnames are generated at once. See raw_hostname.
+
+    """
+    rng = rng or default_rng
 
     if ext_list is not None:
-        assert max(map(lambda i: len(i), ext_list)) < apr_length,\
-        'length must be bigger than any provided extension'
+        max_ext_length = max(map(len, ext_list))
+
+    exts = []
+    label_lengths = []  # lengths for the labels of each hostname
+
+    for apr_length in apr_lengths:
+        assert apr_length > 0, 'length is too short'
+        assert apr_length < 256, 'length is too big'
+
+        ext = None
+        used = 0  # length of the labels plus their dots
+
+        if ext_list is not None:
+            assert max_ext_length < apr_length,\
+                'length must be bigger than any provided extension'
+
+        if ext_list:
+            ext = rng.choice(ext_list)
+            ext = ext.startswith(".") and ext[1:] or ext
+            used = len(ext) + 1
+
+        lengths = []
+        while used < apr_length:
+            label_length = rng.randint(1, min(63, apr_length - used))
+            lengths.append(label_length)
+            used += label_length + 1
+
+        exts.append(ext)
+        label_lengths.append(lengths)
+
+    all_lengths = list(chain.from_iterable(label_lengths))
+    labels = iter(raw_hostname_labels(all_lengths, rng))
+    hostnames = []
+
+    for ext, lengths in zip(exts, label_lengths):
+        hostname = [next(labels) for length in lengths]
+
+        if ext is not None:
+            hostname.append(ext)
+        hostnames.append('.'.join(hostname))
+    return hostnames
+
+
+# second octets which make a private address, by first octet
+IPV4_PRIVATE_SECONDS = {10: range(0, 255), 172: range(16, 32), 192: [168]}
+
 
-    labels = []
+def _ipv4_prefix_offsets():
+    """
+    Returns (first octets, offsets, total): offsets[i] is the index of the
+    first allowed (first, second) octet pair starting with first octets[i].
+
+    """
+    firsts, offsets, total = [], [], 0
+
+    for first in range(1, 255):
+        firsts.append(first)
+        offsets.append(total)
+        total += 255 - len(IPV4_PRIVATE_SECONDS.get(first, ()))
+    return firsts, offsets, total
+
+IPV4_FIRSTS, IPV4_OFFSETS, IPV4_PREFIXES = _ipv4_prefix_offsets()
+IPV4_TOTAL = IPV4_PREFIXES * 255 * 254  # x.x.0-254.1-254
+
+
+def _ipv4_from_index(index):
+    """
+    Maps an integer in [0, IPV4_TOTAL) to the octets of an allowed address.
+
+    """
+    index, fourth = divmod(index, 254)
+    prefix, third = divmod(index, 255)
+
+    i = bisect_right(IPV4_OFFSETS, prefix) - 1
+    first, second = IPV4_FIRSTS[i], prefix - IPV4_OFFSETS[i]
+
+    for private in IPV4_PRIVATE_SECONDS.get(first, ()):
+        if second >= private:  # skip private second octets
+            second += 1
+    return first, second, third, fourth + 1
+
+
+def raw_ipv4(packed=False, rng=None):
+    """
+    Creates a random IPv4 address, outside of reserved, broadcast and
+    private ranges. See raw_ipv4s.
+
+    """
+    return raw_ipv4s(1, packed, rng)[0]
+
+
+def raw_ipv4s(n, packed=False, rng=None):
+    """
+    Creates `n` random IPv4 addresses. Every address comes straight from
+    one uniform integer, no address is generated and then rejected.
+
+    Does not produce the following ip addresses:
+    - 0.x.x.x and 255.x.x.x
+    - x.255.x.x, x.x.255.x and x.x.x.255
+    - x.x.x.0
+    - 10.x.x.x, 172.16.0.0 to 172.31.255.255 and 192.168.x.x
+
+    Keyword arguments:
+    n -- how many addresses
+    packed -- return addresses as 32bits integers instead of dotted strings
+
+    """
+    randrange = (rng or default_rng).randrange
+    addresses = [_ipv4_from_index(randrange(IPV4_TOTAL)) for i in xrange(n)]
+
+    if packed:
+        return [(a << 24) | (b << 16) | (c << 8) | d for a, b, c, d in addresses]
+    return ['%d.%d.%d.%d' % address for address in addresses]
+
+
+def raw_integers(bits, offset, n, rng=None):
+    """
+    Creates `n` random integers uniformly distributed in
+    [offset, offset + 2 ** bits). Uses numpy when available, the integers
+    are the same without it.
+
+    Keyword arguments:
+    bits -- number of random bits per integer, up to 64
+    offset -- smallest possible integer
+    n -- how many integers
+
+    """
+    assert 0 < bits <= 64, 'bits must be between 1 and 64'
+    buf = random_bytes(8 * n, rng)
 
-    if ext_list:
-        ext = choice(ext_list)
-        labels.append(ext.startswith(".") and ext[1:] or ext)
+    if bits == 64:  # can't shift into int64, but the range is the same
+        assert offset == -2 ** 63, 'offset is out of int64 range'
+        if numpy is None:
+            return list(struct.unpack('=%dq' % n, buf))
+        return numpy.frombuffer(buf, dtype=numpy.int64).tolist()
 
-    sum_labels = sum(map(lambda i: len(i), labels))
-    while sum_labels + len(labels) < apr_length:
-        max_length = min(63, apr_length - sum_labels - len(labels))
-        label_length = randint(1, max_length)
+    if numpy is None:
+        shift = 64 - bits
+        return [int((value >> shift) + offset)
+                for value in struct.unpack('=%dQ' % n, buf)]
+
+    values = numpy.frombuffer(buf, dtype=numpy.uint64)
+    return ((values >> (64 - bits)).astype(numpy.int64) + offset).tolist()
+
+
+def raw_digits(length, n, rng=None):
+    """
+    Creates `n` strings of `length` random decimal digits.
+
+    """
+    if length == 0:
+        return [''] * n
+
+    limit = 10 ** length
+    rng = rng or default_rng
+
+    if limit <= 2 ** 63:
+        bits = (limit - 1).bit_length()
+        values = []
+
+        while len(values) < n:  # rejects less than half of the draws
+            drawn = raw_integers(bits, 0, n - len(values), rng)
+            values.extend(value for value in drawn if value < limit)
+    else:
+        values = [rng.randrange(limit) for i in xrange(n)]
+    return ['%0*d' % (length, value) for value in values]
+
+
+def flatten_choices(choices):
+    """
+    Returns a tuple with the values of a field's choices. Values of grouped
+    choices, (group name, choices) pairs, are included in order.
+
+    """
+    values = []
+
+    for value, label in choices:
+        if isinstance(label, (list, tuple)):  # a named group of choices
+            values.extend(value for value, label in label)
+        else:
+            values.append(value)
+    return tuple(values)
+
+
+def cumulative_weights(values, weights):
+    """
+    Returns the running totals of the weights of `values`, for raw_choices.
+    weights maps values to their weight; values not in it weigh 1. Keys
+    which are not values, like choice labels, raise AssertionError.
+
+    """
+    unknown = [key for key in weights if key not in values]
+    assert not unknown, 'weights given for unknown values %r, expected ' \
+        'some of %r' % (unknown, list(values))
+
+    totals, total = [], 0
+
+    for value in values:
+        weight = weights.get(value, 1)
+        assert weight >= 0, 'choice weights must not be negative'
+
+        total += weight
+        totals.append(total)
+
+    assert total > 0, 'at least one choice must have a positive weight'
+    return totals
+
+
+def raw_choices(values, n, cum_weights=None, rng=None):
+    """
+    Picks `n` items of the sequence `values`, with replacement.
+
+    Keyword arguments:
+    cum_weights -- running totals of the weights of values (see
+    cumulative_weights). If None, all values are equally likely.
+
+    """
+    random = (rng or default_rng).random
 
-        label = raw_hostname_label(label_length)
-        labels.insert(0, label)
-        sum_labels = sum(map(lambda i: len(i), labels))
+    if cum_weights is None:
+        size = len(values)
+        return [values[int(random() * size)] for i in xrange(n)]
 
-    return '.'.join(labels)
+    total = cum_weights[-1]
+    return [values[bisect_right(cum_weights, random() * total)]
+            for i in xrange(n)]
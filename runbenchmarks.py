@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+
+import os
+import sys
+
+parent = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, parent)
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'test_settings'
+
+
+def runbenchmarks():
+    from django.db import connection
+    from model_mommy.benchmark import main
+
+    database_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+
+    try:
+        result = main(sys.argv[1:])
+    finally:
+        connection.creation.destroy_test_db(database_name, verbosity=0)
+    sys.exit(result)
+
+
+if __name__ == '__main__':
+    runbenchmarks()
@@ -5,7 +5,7 @@ setuptools.setup(
     name="model_mommy",
     version="0.8",
     packages=["model_mommy"],
-    install_requires=["django"],
+    install_requires=["django>=1.4"],
     author="vandersonmota",
     author_email="vandersonmota@gmail.com",
     url="http://github.com/vandersonmota/model_mommy",